@@ -1,29 +1,42 @@
 from setuptools import setup, find_packages  # Python packaging tools
+import hashlib     # Hash requirements.txt to detect changes
 import os          # Operating system functionality (check file/folder existence)
 import subprocess  # Run external commands (create virtual environment, run pip)
 import sys         # System information (current Python path, OS type)
+from pathlib import Path  # Read requirements.txt and the hash stamp file
 
 # Create virtual environment in root folder
 venv_path = 'venv'
 
+# Stamp file recording the requirements.txt hash of the last successful install
+req_hash_path = Path(venv_path) / '.req_hash'
+
 # Check if venv folder already exists
 if not os.path.exists(venv_path):
     # Create virtual environment using subprocess
     subprocess.run([sys.executable, '-m', 'venv', venv_path], check=True)
     print(f"Virtual environment created at {venv_path}")
+else:
+    # If venv folder already exists, skip creation to avoid duplication
+    print(f"Virtual environment already exists at {venv_path}")
 
-    # Get pip path based on OS (different OS have different virtual environment structures)
-    if sys.platform == 'win32':
-        # Windows
-        pip_path = os.path.join(venv_path, 'Scripts', 'pip')
-    else:
-        # macOS/Linux
-        pip_path = os.path.join(venv_path, 'bin', 'pip')
+# Get pip path based on OS (different OS have different virtual environment structures)
+if sys.platform == 'win32':
+    # Windows
+    pip_path = os.path.join(venv_path, 'Scripts', 'pip')
+else:
+    # macOS/Linux
+    pip_path = os.path.join(venv_path, 'bin', 'pip')
+
+# Only run pip when requirements.txt changed since the last install
+req_hash = hashlib.sha256(Path('requirements.txt').read_bytes()).hexdigest()
+installed_hash = req_hash_path.read_text().strip() if req_hash_path.exists() else None
 
-    # Use pip from virtual environment to install dependencies
+if req_hash != installed_hash:
+    # Use pip from virtual environment to install dependencies (prefer wheels over source builds)
     print("Installing requirements...")
-    subprocess.run([pip_path, 'install', '-r', 'requirements.txt'], check=True)
+    subprocess.run([pip_path, 'install', '--prefer-binary', '-r', 'requirements.txt'], check=True)
+    req_hash_path.write_text(req_hash)
     print("Requirements installed successfully!")
 else:
-    # If venv folder already exists, skip creation to avoid duplication
-    print(f"Virtual environment already exists at {venv_path}")
+    print("Requirements unchanged, skipping install")
@@ -3,49 +3,107 @@ Agent definitions for the CV customization system.
 Each agent has a specific role, goal, and backstory.
 """
 
-from crewai import Agent
-from crewai_tools import tool
-from typing import Any
-
-# =====================================================
-# AGENT 1: Job Analyzer Agent
-# =====================================================
-job_analyzer_agent = Agent(
-    role="Job Description Analyzer",
-    goal="Extract and analyze job posting details to understand requirements, skills needed, and company culture",
-    backstory="""You are an expert HR analyst with 15+ years of experience analyzing job postings.
+import functools
+from typing import TYPE_CHECKING, Tuple
+
+# crewai (and LiteLLM behind it) is heavy to import, so it's only loaded when agents are built
+if TYPE_CHECKING:
+    from crewai import Agent
+    from llm import CachingLLM
+
+
+@functools.lru_cache(maxsize=1)
+def _get_llms() -> Tuple["CachingLLM", "CachingLLM"]:
+    """
+    Get the LLMs shared by all agents
+
+    Returns:
+        Tuple of (llm, customizer_llm). The static role/goal/backstory prefix is
+        marked for prompt caching; the customizer writes the final CV, so its
+        output can be streamed to the caller.
+    """
+    from llm import make_llm
+
+    return make_llm(), make_llm(streaming=True)
+
+
+def _squash(text: str) -> str:
+    """Collapse the indentation and line breaks of a triple-quoted prompt into single spaces"""
+    return " ".join(text.split())
+
+
+# Backstories are squashed once at import: indentation whitespace would otherwise
+# be sent (and billed) as prompt tokens on every LLM call
+JOB_ANALYZER_BACKSTORY = _squash("""You are an expert HR analyst with 15+ years of experience analyzing job postings.
     You have a keen eye for identifying what skills, experiences, and qualities employers really value.
     You understand both explicit requirements and implicit preferences in job descriptions.
-    Your goal is to provide a comprehensive analysis that helps tailor candidates' CVs effectively.""",
-    verbose=True,
-    allow_delegation=False,
-)
-
-# =====================================================
-# AGENT 2: CV Matcher Agent
-# =====================================================
-cv_matcher_agent = Agent(
-    role="CV and Job Matcher",
-    goal="Compare candidate's CV against job requirements and identify gaps, strengths, and optimization opportunities",
-    backstory="""You are a professional resume coach and career strategist with 10+ years of experience.
+    Your goal is to provide a comprehensive analysis that helps tailor candidates' CVs effectively.""")
+
+CV_MATCHER_BACKSTORY = _squash("""You are a professional resume coach and career strategist with 10+ years of experience.
     You excel at identifying how to position a candidate's experience to match job requirements.
     You understand keyword matching, skill alignment, and experience relevance.
-    You provide strategic insights on what to emphasize and what to downplay.""",
-    verbose=True,
-    allow_delegation=False,
-)
-
-# =====================================================
-# AGENT 3: CV Customizer Agent
-# =====================================================
-cv_customizer_agent = Agent(
-    role="CV Customizer and Writer",
-    goal="Generate a tailored CV that highlights the most relevant experiences and skills for the target job",
-    backstory="""You are a master resume writer who has helped thousands of candidates land interviews.
+    You provide strategic insights on what to emphasize and what to downplay.""")
+
+CV_CUSTOMIZER_BACKSTORY = _squash("""You are a master resume writer who has helped thousands of candidates land interviews.
     You know how to rewrite bullet points to highlight impact and relevance without being dishonest.
     You understand ATS (Applicant Tracking Systems) and keyword optimization.
     You excel at crafting compelling narratives that connect candidate experience to job requirements.
-    You maintain integrity while maximizing the candidate's chances of success.""",
-    verbose=True,
-    allow_delegation=False,
-)
+    You maintain integrity while maximizing the candidate's chances of success.""")
+
+@functools.lru_cache(maxsize=2)
+def get_agents(verbose: bool = False) -> Tuple["Agent", "Agent", "Agent"]:
+    """Get the process-wide agents (one set per verbosity), building them on first use"""
+    return make_agents(verbose=verbose)
+
+
+def make_agents(verbose: bool = False) -> Tuple["Agent", "Agent", "Agent"]:
+    """
+    Build the three agents
+
+    Args:
+        verbose: Print full agent prompts and responses (interactive debugging only)
+
+    Returns:
+        Tuple of (job_analyzer_agent, cv_matcher_agent, cv_customizer_agent)
+    """
+    from crewai import Agent
+
+    llm, customizer_llm = _get_llms()
+
+    # =====================================================
+    # AGENT 1: Job Analyzer Agent
+    # =====================================================
+    job_analyzer_agent = Agent(
+        role="Job Description Analyzer",
+        goal="Extract and analyze job posting details to understand requirements, skills needed, and company culture",
+        backstory=JOB_ANALYZER_BACKSTORY,
+        llm=llm,
+        verbose=verbose,
+        allow_delegation=False,
+    )
+
+    # =====================================================
+    # AGENT 2: CV Matcher Agent
+    # =====================================================
+    cv_matcher_agent = Agent(
+        role="CV and Job Matcher",
+        goal="Compare candidate's CV against job requirements and identify gaps, strengths, and optimization opportunities",
+        backstory=CV_MATCHER_BACKSTORY,
+        llm=llm,
+        verbose=verbose,
+        allow_delegation=False,
+    )
+
+    # =====================================================
+    # AGENT 3: CV Customizer Agent
+    # =====================================================
+    cv_customizer_agent = Agent(
+        role="CV Customizer and Writer",
+        goal="Generate a tailored CV that highlights the most relevant experiences and skills for the target job",
+        backstory=CV_CUSTOMIZER_BACKSTORY,
+        llm=customizer_llm,
+        verbose=verbose,
+        allow_delegation=False,
+    )
+
+    return job_analyzer_agent, cv_matcher_agent, cv_customizer_agent
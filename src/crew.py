@@ -3,39 +3,249 @@ Main Crew orchestration for the Job CV Customization System.
 This coordinates all agents and tasks.
 """
 
-from crewai import Crew
-from agents import job_analyzer_agent, cv_matcher_agent, cv_customizer_agent
-from tasks import analyze_job_task, match_cv_task, customize_cv_task
+from agents import get_agents
+from tasks import make_analysis_task, make_fused_tailoring_task, make_tailoring_tasks
+from utils import CVParser, ensure_dir, write_atomic
+import asyncio
+import contextvars
+import functools
+import os
+import re
+import queue
+import threading
 import yaml
+from hashlib import blake2b, sha256
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Tuple
+
+# crewai is imported on first use so `import crew` stays cheap (CLI startup, test collection)
+if TYPE_CHECKING:
+    from crewai import Crew
+
+# Prefer the libyaml-backed loader, fall back to pure Python if unavailable
+try:
+    from yaml import CSafeLoader
+except ImportError:
+    from yaml import SafeLoader as CSafeLoader
+
+# orjson parses the fused task's JSON answer faster; the stdlib json module is the fallback
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Bump whenever agent backstories or task prompts change to invalidate cached responses
+AGENT_VERSION = "5"
+
+# crewai's marker before an agent's final answer in the raw LLM output
+_FINAL_ANSWER = "Final Answer:"
+
+# Introductory sentence the LLM sometimes puts before the YAML
+_INTRO_RE = re.compile(
+    r"^\s*(?:Here is the customized CV:|Here's the customized CV:|Below is the customized CV:"
+    r"|The customized CV is:|Customized CV:)\s*",
+    re.I,
+)
+
+# Outputs above this size skip the validation parse
+_MAX_VALIDATE_CHARS = 64 * 1024
+
+
+@functools.lru_cache(maxsize=4)
+def _get_crews(verbose: bool = False, fused: bool = False) -> Tuple["Crew", "Crew"]:
+    """
+    Get the process-wide crews shared by all JobCVCrew instances (one pair per verbosity and mode)
+
+    Args:
+        verbose: Print full agent prompts and responses
+        fused: Match and customize in a single task (one LLM call, JSON answer)
+
+    Returns:
+        Tuple of (analysis_crew, tailoring_crew). The analysis crew depends only
+        on the job posting; the tailoring crew matches and customizes the CV.
+    """
+    from crewai import Crew
+
+    job_analyzer_agent, cv_matcher_agent, cv_customizer_agent = get_agents(verbose=verbose)
+
+    analysis_crew = Crew(
+        agents=[job_analyzer_agent],
+        tasks=[make_analysis_task(job_analyzer_agent)],
+        verbose=verbose,
+    )
+    if fused:
+        tailoring_crew = Crew(
+            agents=[cv_customizer_agent],
+            tasks=[make_fused_tailoring_task(cv_customizer_agent)],
+            verbose=verbose,
+        )
+    else:
+        tailoring_crew = Crew(
+            agents=[cv_matcher_agent, cv_customizer_agent],
+            tasks=list(make_tailoring_tasks(cv_matcher_agent, cv_customizer_agent)),
+            verbose=verbose,
+        )
+    return analysis_crew, tailoring_crew
+
+
+def _cache_model() -> str:
+    """
+    The agents' model as it enters cache keys
+
+    Read from the environment like llm.DEFAULT_MODEL, without importing llm
+    (and crewai) just to check the cache. Unset means the built-in default;
+    changing that default also bumps AGENT_VERSION.
+    """
+    return os.getenv("CV_AGENT_MODEL", "")
+
+
+def _analysis_cache_path(cache_dir: Optional[Path], job_posting: str) -> Optional[Path]:
+    """Path of the cached job analysis for this job posting, model and agent version"""
+    if cache_dir is None:
+        return None
+
+    key = sha256(
+        job_posting.encode() + b'\0' + _cache_model().encode() + b'\0' + AGENT_VERSION.encode()
+    ).hexdigest()
+    return cache_dir / "analysis" / f"{key}.txt"
+
+
+def _load_cached_analysis(cache_dir: Optional[Path], job_posting: str) -> Optional[str]:
+    """Return the cached job analysis for this job posting, if any"""
+    cache_path = _analysis_cache_path(cache_dir, job_posting)
+    if cache_path is None or not cache_path.exists():
+        return None
+
+    print(f"✓ Reusing cached job analysis from {cache_path}")
+    return cache_path.read_text(encoding='utf-8')
+
+
+def _store_analysis(cache_dir: Optional[Path], job_posting: str, job_analysis: str) -> None:
+    """Cache a job analysis so other CVs targeting the same posting skip the analyzer"""
+    cache_path = _analysis_cache_path(cache_dir, job_posting)
+    if cache_path is None or not job_analysis:
+        return
+
+    write_atomic(cache_path, job_analysis.encode('utf-8'))
+
+
+async def analyze_job(
+    job_posting: str,
+    cache_dir: Optional[str] = ".cache/responses",
+    verbose: bool = False,
+) -> str:
+    """
+    Run only the job analysis stage, which needs no CV
+
+    Lets callers overlap the analyzer's LLM round-trip with loading the CV;
+    pass the result to JobCVCrew.customize_cv_for_job(job_analysis=...).
+
+    Args:
+        job_posting: The job posting text to analyze
+        cache_dir: Directory for cached job analyses (None disables caching)
+        verbose: Print full agent prompts and responses
+
+    Returns:
+        The job analysis text
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+    job_analysis = _load_cached_analysis(cache_dir, job_posting)
+    if job_analysis is None:
+        analysis_crew, _ = _get_crews(verbose)
+        job_analysis = str(await analysis_crew.copy().kickoff_async(inputs={"job_posting": job_posting}))
+        _store_analysis(cache_dir, job_posting, job_analysis)
+    return job_analysis
+
 
 class JobCVCrew:
     """Orchestrates the entire job CV customization workflow"""
 
-    def __init__(self, cv_path: str = "inputs/base_cv.yaml", template_path: str = "templates/template.docx"):
+    def __init__(
+        self,
+        cv_path: str = "inputs/base_cv.yaml",
+        template_path: str = "templates/template.docx",
+        validate: bool = False,
+        cache_dir: Optional[str] = ".cache/responses",
+        verbose: bool = False,
+        warm: bool = False,
+        fused: bool = False,
+    ):
         """
         Initialize the crew with a base CV and template
 
         Args:
             cv_path: Path to the base CV in YAML format
             template_path: Path to the DOCX template file
+            validate: Parse generated YAML even when running with python -O
+            cache_dir: Directory for cached job analyses and crew responses (None disables caching)
+            verbose: Print full agent prompts and responses (interactive debugging only)
+            warm: Pre-register the CV prompt prefix in the provider's prompt cache in the background
+            fused: Match and customize in one LLM call that answers with JSON instead of two
+                sequential calls (customize_cv_for_job_stream then streams the raw JSON)
         """
         self.cv_path = cv_path
         self.template_path = template_path
+        self.validate = validate
+        self.verbose = verbose
+        self.fused = fused
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._last_output = None
+        self._last_parsed = None
         self.base_cv = self._load_cv()
 
-        # Create the crew with all agents and tasks
-        self.crew = Crew(
-            agents=[job_analyzer_agent, cv_matcher_agent, cv_customizer_agent],
-            tasks=[analyze_job_task, match_cv_task, customize_cv_task],
-            verbose=True,
-        )
+        # base_cv never changes after loading, so serialize it for the agents once
+        self._cv_string = CVParser.cv_to_compact(self.base_cv)
+
+        self._warmup_task = None
+        if warm:
+            self._warm_cache()
     
+    def _warm_cache(self) -> None:
+        """
+        Warm the provider's prompt cache with the CV prefix without blocking
+
+        Prompt caches expire after a few minutes, so for interactive sessions
+        this registers the prefix before the user submits a job posting.
+        Runs as a task on the current event loop if there is one, otherwise
+        in a daemon thread.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=self._send_warmup, daemon=True).start()
+        else:
+            self._warmup_task = loop.create_task(asyncio.to_thread(self._send_warmup))
+
+    def _send_warmup(self) -> None:
+        """Send 1-token completions whose prompts match each tailoring task up to the closing </CV>"""
+        from crewai.utilities.prompts import Prompts
+        from llm import CV_BOUNDARY, make_llm
+
+        _, tailoring_crew = _get_crews(self.verbose, self.fused)
+        inputs = self._build_inputs(job_posting="", job_analysis="")
+
+        try:
+            for task in tailoring_crew.tasks:
+                agent = task.agent
+                prompt = Prompts(agent=agent, has_tools=False, use_system_prompt=True).task_execution()
+
+                # Same prefix crewai sends for this task, cut at the cache checkpoint
+                description = task.description.format(**inputs)
+                head = description[:description.index(CV_BOUNDARY) + len(CV_BOUNDARY)]
+                messages = [
+                    {"role": "system", "content": prompt["system"]},
+                    {"role": "user", "content": prompt["user"].split("{input}")[0] + head},
+                ]
+                make_llm(agent.llm.model, max_tokens=1).call(messages)
+            print("✓ Prompt cache warmed with base CV")
+        except Exception as e:
+            # Warming is best-effort; the first real request just pays the full prefill
+            print(f"⚠ Warning: Prompt cache warm-up failed: {e}")
+
     def _load_cv(self) -> dict:
-        """Load and parse the base CV from YAML file"""
+        """Load and parse the base CV from a YAML (or JSON) file"""
         try:
-            with open(self.cv_path, 'r') as file:
-                cv = yaml.safe_load(file)
+            cv = CVParser.load_cv(self.cv_path)
             print(f"✓ Loaded base CV from {self.cv_path}")
             return cv
         except FileNotFoundError:
@@ -45,12 +255,13 @@ class JobCVCrew:
             print(f"✗ Error parsing YAML: {e}")
             raise
     
-    def customize_cv_for_job(self, job_posting: str) -> str:
+    def customize_cv_for_job(self, job_posting: str, job_analysis: Optional[str] = None) -> str:
         """
         Main workflow: Takes a job posting and generates customized CV
 
         Args:
             job_posting: The job posting text to customize CV for
+            job_analysis: Analysis from analyze_job(); when given, the analysis stage is skipped
 
         Returns:
             The customized CV as a YAML string
@@ -59,24 +270,222 @@ class JobCVCrew:
         print("Starting CV Customization Workflow")
         print("="*60 + "\n")
 
-        # Format CV as string for the agents
-        cv_string = yaml.dump(self.base_cv, default_flow_style=False)
+        cached = self._load_cached_response(job_posting)
+        if cached is not None:
+            self._last_output = cached
+            self._last_parsed = None
+            return cached
 
-        # Execute the crew with the inputs
-        inputs = {
-            "job_posting": job_posting,
-            "candidate_cv": cv_string,
-            "original_cv": cv_string,
-        }
+        analysis_crew, tailoring_crew = _get_crews(self.verbose, self.fused)
+
+        # Each run gets its own crew copies: crewai writes the filled-in
+        # descriptions and task outputs onto the tasks, which concurrent
+        # runs (other threads, the streaming worker) would otherwise share
 
-        result = self.crew.kickoff(inputs=inputs)
+        # Stage A: analyze the job posting (cached per posting, shared across CVs)
+        if job_analysis is None:
+            job_analysis = _load_cached_analysis(self.cache_dir, job_posting)
+        if job_analysis is None:
+            job_analysis = str(analysis_crew.copy().kickoff(inputs={"job_posting": job_posting}))
+            _store_analysis(self.cache_dir, job_posting, job_analysis)
+
+        # Stage B: match and customize the CV against the analysis
+        result = tailoring_crew.copy().kickoff(inputs=self._build_inputs(job_posting, job_analysis))
 
         # Post-process to ensure pure YAML output
-        cleaned_result = self._clean_yaml_output(str(result))
+        cleaned_result, parsed, valid = self._clean_yaml_output(self._unpack_output(str(result)))
+        self._last_output = cleaned_result
+        self._last_parsed = parsed
+        if valid:
+            self._store_response(job_posting, cleaned_result)
 
         return cleaned_result
 
-    def _clean_yaml_output(self, output: str) -> str:
+    def customize_cv_for_job_stream(self, job_posting: str) -> Iterator[str]:
+        """
+        Streaming variant of customize_cv_for_job for interactive UIs
+
+        Yields the customizer agent's final answer as it is generated. Once the
+        iterator is exhausted the cleaned YAML has been validated and cached
+        exactly as in customize_cv_for_job, and get_customized_cv_dict() returns it.
+
+        Args:
+            job_posting: The job posting text to customize CV for
+
+        Yields:
+            Chunks of the customized CV text
+        """
+        from llm import stream_sink
+
+        chunks = queue.Queue()
+        done = object()
+        outcome = {}
+
+        def run():
+            try:
+                outcome["cv"] = self.customize_cv_for_job(job_posting)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                chunks.put(done)
+
+        # The sink is set in the worker's context only, so other runs aren't streamed
+        context = contextvars.copy_context()
+        context.run(stream_sink.set, chunks.put)
+        threading.Thread(target=context.run, args=(run,), daemon=True).start()
+
+        # Skip the agent's reasoning; stream only what follows "Final Answer:"
+        pending = ""
+        streaming = False
+        while (chunk := chunks.get()) is not done:
+            if streaming:
+                yield chunk
+                continue
+            pending += chunk
+            if _FINAL_ANSWER in pending:
+                streaming = True
+                rest = pending.split(_FINAL_ANSWER, 1)[1]
+                if rest:
+                    yield rest
+
+        if "error" in outcome:
+            raise outcome["error"]
+        # Cache hit: nothing was generated, hand back the whole CV at once
+        if not streaming:
+            yield outcome["cv"]
+
+    def get_customized_cv_dict(self) -> Optional[dict]:
+        """
+        Get the last customized CV as a dictionary
+
+        Reuses the tree parsed during validation; only parses if validation was skipped.
+
+        Returns:
+            The parsed customized CV, or None if no CV has been generated yet
+        """
+        if self._last_parsed is None and self._last_output is not None:
+            self._last_parsed = yaml.load(self._last_output, Loader=CSafeLoader)
+        return self._last_parsed
+
+    async def customize_cv_for_jobs(
+        self,
+        postings: List[str],
+        max_inflight: int = 8,
+        on_result: Optional[Callable[[int, str], None]] = None,
+    ) -> List[str]:
+        """
+        Customize the CV for several job postings concurrently
+
+        Args:
+            postings: The job posting texts to customize CV for
+            max_inflight: Maximum number of crew runs in flight at once
+            on_result: Optional callback receiving (index, customized_cv) as each job finishes
+
+        Returns:
+            The customized CVs as YAML strings, in the same order as postings
+        """
+        semaphore = asyncio.Semaphore(max_inflight)
+
+        async def run(idx: int, job_posting: str):
+            cached = self._load_cached_response(job_posting)
+            if cached is not None:
+                return idx, cached
+
+            analysis_crew, tailoring_crew = _get_crews(self.verbose, self.fused)
+
+            async with semaphore:
+                # Each run gets its own crew copies so task state isn't shared;
+                # the identical CV prefix still hits the provider's prompt cache
+                job_analysis = _load_cached_analysis(self.cache_dir, job_posting)
+                if job_analysis is None:
+                    job_analysis = str(await analysis_crew.copy().kickoff_async(inputs={"job_posting": job_posting}))
+                    _store_analysis(self.cache_dir, job_posting, job_analysis)
+
+                result = await tailoring_crew.copy().kickoff_async(
+                    inputs=self._build_inputs(job_posting, job_analysis)
+                )
+
+            customized_cv, _, valid = self._clean_yaml_output(self._unpack_output(str(result)))
+            if valid:
+                self._store_response(job_posting, customized_cv)
+            return idx, customized_cv
+
+        results = [None] * len(postings)
+        for future in asyncio.as_completed([run(idx, posting) for idx, posting in enumerate(postings)]):
+            idx, customized_cv = await future
+            results[idx] = customized_cv
+            print(f"✓ Customized CV ready for job {idx + 1}/{len(postings)}")
+            if on_result is not None:
+                on_result(idx, customized_cv)
+
+        return results
+
+    def _build_inputs(self, job_posting: str, job_analysis: str) -> dict:
+        """Build the tailoring crew inputs (static CV first, dynamic posting and analysis last)"""
+        return {
+            "original_cv": self._cv_string,
+            "job_posting": job_posting,
+            "job_analysis": job_analysis,
+        }
+
+    def _response_cache_path(self, job_posting: str) -> Optional[Path]:
+        """Path of the cached response for this CV, job posting, model, mode and agent version"""
+        if self.cache_dir is None:
+            return None
+
+        key = blake2b(b'\0'.join((
+            self._cv_string.encode(),
+            job_posting.encode(),
+            _cache_model().encode(),
+            b'fused' if self.fused else b'tasks',
+            AGENT_VERSION.encode(),
+        ))).hexdigest()
+        return self.cache_dir / f"{key}.yaml"
+
+    def _load_cached_response(self, job_posting: str) -> Optional[str]:
+        """Return the cached customized CV for this job posting, if any"""
+        cache_path = self._response_cache_path(job_posting)
+        if cache_path is None or not cache_path.exists():
+            return None
+
+        print(f"✓ Reusing cached customized CV from {cache_path}")
+        return cache_path.read_text(encoding='utf-8')
+
+    def _store_response(self, job_posting: str, customized_cv: str) -> None:
+        """Cache a customized CV for this job posting"""
+        cache_path = self._response_cache_path(job_posting)
+        if cache_path is None or not customized_cv:
+            return
+
+        write_atomic(cache_path, customized_cv.encode('utf-8'))
+
+    def _unpack_output(self, output: str) -> str:
+        """
+        Extract the customized CV from the tailoring crew's final answer
+
+        The two-task crew answers with the YAML itself; the fused task answers
+        with a JSON object whose "customized_cv_yaml" field holds it.
+        """
+        if not self.fused:
+            return output
+
+        start, end = output.find("{"), output.rfind("}")
+        try:
+            answer = _json_loads(output[start:end + 1]) if start != -1 else None
+            customized_cv = answer["customized_cv_yaml"]
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"⚠ Warning: Fused answer is not the expected JSON ({e}); treating it as YAML")
+            return output
+
+        # The CV is shown to the model as JSON, so it may answer with an object instead of a YAML string
+        if isinstance(customized_cv, dict):
+            return CVParser.cv_to_string(customized_cv)
+        if not isinstance(customized_cv, str):
+            print("⚠ Warning: Fused answer's customized_cv_yaml is not a string; treating the answer as YAML")
+            return output
+        return customized_cv
+
+    def _clean_yaml_output(self, output: str) -> Tuple[str, Optional[dict], bool]:
         """
         Clean the agent output to ensure it's pure YAML
 
@@ -84,38 +493,51 @@ class JobCVCrew:
             output: The raw output from the agent
 
         Returns:
-            Cleaned YAML string
+            Tuple of (cleaned YAML string, parsed CV or None if validation was skipped or failed,
+            True only if the output was parsed and validated; only such output is cached)
         """
         
         # Remove markdown code blocks if present
-        if "```yaml" in output:
-            output = output.split("```yaml")[1].split("```")[0]
-        elif "```" in output:
-            output = output.split("```")[1].split("```")[0]
-
-        # Remove common introductory phrases
-        intro_phrases = [
-            "Here is the customized CV:",
-            "Here's the customized CV:",
-            "Below is the customized CV:",
-            "The customized CV is:",
-            "Customized CV:",
-        ]
-        for phrase in intro_phrases:
-            if phrase in output:
-                output = output.split(phrase, 1)[1]
+        _, fence, rest = output.partition("```yaml")
+        if not fence:
+            _, fence, rest = output.partition("```")
+        if fence:
+            output = rest.partition("```")[0]
+
+        # Remove a common introductory phrase at the start (not the same words inside the CV)
+        intro = _INTRO_RE.match(output)
+        if intro:
+            output = output[intro.end():]
 
         # Strip whitespace
         output = output.strip()
 
-        # Validate it's actual YAML
-        try:
-            yaml.safe_load(output)
+        # Empty output isn't worth running the parser on
+        if not output:
+            print("⚠ Warning: Generated content is empty")
+            return output, None, False
+
+        # Parsing dominates for very large outputs; get_customized_cv_dict parses them on demand
+        # (unvalidated, so they are not cached)
+        if len(output) > _MAX_VALIDATE_CHARS:
+            return output, None, False
+
+        # Validate it's actual YAML (skipped under python -O unless requested)
+        parsed = None
+        if __debug__ or self.validate:
+            try:
+                parsed = yaml.load(output, Loader=CSafeLoader)
+            except yaml.YAMLError as e:
+                print(f"⚠ Warning: Generated content may not be valid YAML: {e}")
+                return output, None, False
+            # Prose parses too: an apology as a plain scalar, "Error: rate limited" as a
+            # one-key mapping. A customized CV keeps the base CV's top-level sections.
+            if not isinstance(parsed, dict) or not parsed.keys() & self.base_cv.keys():
+                print("⚠ Warning: Generated content is not a CV")
+                return output, None, False
             print("✓ YAML validation passed")
-        except yaml.YAMLError as e:
-            print(f"⚠ Warning: Generated content may not be valid YAML: {e}")
 
-        return output
+        return output, parsed, parsed is not None
     
     def save_customized_cv(self, customized_cv: str, output_path: str = None) -> str:
         """
@@ -129,12 +551,10 @@ class JobCVCrew:
             Path to the saved file
         """
         if output_path is None:
-            output_dir = Path("outputs")
-            output_dir.mkdir(exist_ok=True)
-            output_path = output_dir / "customized_cv.yaml"
+            output_path = ensure_dir("outputs") / "customized_cv.yaml"
 
-        with open(output_path, 'w') as file:
-            file.write(customized_cv)
+        # Atomic write so an interrupted save never leaves a truncated CV behind
+        write_atomic(Path(output_path), customized_cv.encode('utf-8'))
 
         print(f"✓ Customized CV saved to {output_path}")
         return str(output_path)
@@ -159,7 +579,7 @@ class JobCVCrew:
 
         # Load CV data
         with open(yaml_cv_path, 'r') as f:
-            cv_data = yaml.safe_load(f)
+            cv_data = yaml.load(f, Loader=CSafeLoader)
 
         # Fill template
         result = DOCXFiller.fill_template(self.template_path, cv_data, output_docx_path)
@@ -6,14 +6,48 @@ from docx import Document
 from pathlib import Path
 import yaml
 import re
+import sys
 from typing import Dict, Any
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from bisect import bisect_right
+from copy import deepcopy
+from lxml import etree
+from utils import ensure_dir
+
+# Aho-Corasick placeholder matching, with a compiled regex union as the fallback
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Prefer the libyaml-backed loader, fall back to pure Python if unavailable
+try:
+    from yaml import CSafeLoader
+except ImportError:
+    from yaml import SafeLoader as CSafeLoader
+
+# WordprocessingML namespace and the fully qualified tags compared in the element walk
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_R, _PPR = _W + 'r', _W + 'pPr'
+
+# Compiled XPaths: paragraph runs/hyperlinks in document order, and the first
+# non-empty <w:t> of each run inside a hyperlink
+_CHILDREN_XPATH = etree.XPath('./w:r | ./w:hyperlink', namespaces={'w': _W[1:-1]})
+_HYPERLINK_TEXT_XPATH = etree.XPath('.//w:r/w:t[string()][1]', namespaces={'w': _W[1:-1]})
+_BODY_PARAGRAPHS_XPATH = etree.XPath('.//w:p', namespaces={'w': _W[1:-1]})
+
+# Any {{...}} placeholder in the template text
+_PLACEHOLDER_RE = re.compile(r'\{\{[^{}]+\}\}')
 
 
 class DOCXFiller:
     """Fill DOCX templates with CV data"""
 
+    # Hyperlink run properties by (font name, font size in pt), cloned per hyperlink
+    _RPR_CACHE: Dict[tuple, Any] = {}
+
     @staticmethod
     def _add_hyperlink(paragraph, text, url, run_template):
         """
@@ -25,12 +59,26 @@ class DOCXFiller:
             url: The URL to link to
             run_template: Template run to copy formatting from
         """
+        paragraph._p.append(DOCXFiller._build_hyperlink(paragraph.part, text, url, run_template))
+
+    @staticmethod
+    def _build_hyperlink(part, text, url, run_template):
+        """
+        Build a <w:hyperlink> element and register its URL relationship on part
+
+        Args:
+            part: Document part the hyperlink will live in
+            text: Display text for the hyperlink
+            url: The URL to link to
+            run_template: Template run to copy formatting from
+
+        Returns:
+            The hyperlink element (not yet attached to a paragraph)
+        """
         # Ensure URL has protocol
         if not url.startswith('http://') and not url.startswith('https://'):
             url = 'https://' + url
 
-        # Get paragraph's part
-        part = paragraph.part
         r_id = part.relate_to(url, 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink', is_external=True)
 
         # Create hyperlink element
@@ -39,29 +87,38 @@ class DOCXFiller:
 
         # Create a new run for the hyperlink
         new_run = OxmlElement('w:r')
-        rPr = OxmlElement('w:rPr')
 
-        # Copy formatting from template run
-        if run_template.font.name:
-            rFonts = OxmlElement('w:rFonts')
-            rFonts.set(qn('w:ascii'), run_template.font.name)
-            rPr.append(rFonts)
+        # Formatting depends only on the template run's font, so build it once per font
+        font_name = run_template.font.name
+        font_size = run_template.font.size.pt if run_template.font.size else None
+        key = (font_name, font_size)
+        rPr = DOCXFiller._RPR_CACHE.get(key)
+        if rPr is None:
+            rPr = OxmlElement('w:rPr')
+
+            # Copy formatting from template run
+            if font_name:
+                rFonts = OxmlElement('w:rFonts')
+                rFonts.set(qn('w:ascii'), font_name)
+                rPr.append(rFonts)
 
-        if run_template.font.size:
-            sz = OxmlElement('w:sz')
-            sz.set(qn('w:val'), str(run_template.font.size.pt * 2))
-            rPr.append(sz)
+            if font_size:
+                sz = OxmlElement('w:sz')
+                sz.set(qn('w:val'), str(font_size * 2))
+                rPr.append(sz)
 
-        # Add blue color and underline for hyperlinks
-        color = OxmlElement('w:color')
-        color.set(qn('w:val'), '0563C1')  # Blue color for hyperlinks
-        rPr.append(color)
+            # Add blue color and underline for hyperlinks
+            color = OxmlElement('w:color')
+            color.set(qn('w:val'), '0563C1')  # Blue color for hyperlinks
+            rPr.append(color)
 
-        u = OxmlElement('w:u')
-        u.set(qn('w:val'), 'single')
-        rPr.append(u)
+            u = OxmlElement('w:u')
+            u.set(qn('w:val'), 'single')
+            rPr.append(u)
 
-        new_run.append(rPr)
+            DOCXFiller._RPR_CACHE[key] = rPr
+
+        new_run.append(deepcopy(rPr))
 
         # Add text
         t = OxmlElement('w:t')
@@ -69,7 +126,7 @@ class DOCXFiller:
         new_run.append(t)
 
         hyperlink.append(new_run)
-        paragraph._p.append(hyperlink)
+        return hyperlink
 
     @staticmethod
     def fill_template(template_path: str, cv_data: Dict[str, Any], output_path: str) -> str:
@@ -87,38 +144,32 @@ class DOCXFiller:
         # Load template
         doc = Document(template_path)
 
-        # Build replacement mappings from CV data
-        replacements = DOCXFiller._build_replacements(cv_data)
+        body = doc._body
+        paragraphs = _BODY_PARAGRAPHS_XPATH(body._element)
+
+        # Build replacement mappings from CV data, keeping only placeholders the template uses
+        paragraph_texts = [''.join(p.itertext()) for p in paragraphs]
+        template_text = '\n'.join(paragraph_texts)
+        template_keys = set(_PLACEHOLDER_RE.findall(template_text))
+        replacements = {
+            key: value for key, value in DOCXFiller._build_replacements(cv_data).items()
+            if key in template_keys
+        }
 
         print(f"📝 Filling template with {len(replacements)} placeholders...")
 
-        # Replace in paragraphs (multiple passes to handle multiple placeholders per paragraph)
-        for para in doc.paragraphs:
-            # Keep replacing until no more placeholders found
-            max_iterations = 20  # Prevent infinite loop
-            for _ in range(max_iterations):
-                full_text = para.text
-                has_placeholder = any(placeholder in full_text for placeholder in replacements.keys())
-                if not has_placeholder:
-                    break
-                DOCXFiller._replace_in_paragraph(para, replacements, cv_data)
-
-        # Replace in tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        # Keep replacing until no more placeholders found
-                        max_iterations = 20
-                        for _ in range(max_iterations):
-                            full_text = para.text
-                            has_placeholder = any(placeholder in full_text for placeholder in replacements.keys())
-                            if not has_placeholder:
-                                break
-                            DOCXFiller._replace_in_paragraph(para, replacements, cv_data)
+        # One automaton over all placeholders, reused for every paragraph and cell
+        automaton = DOCXFiller._build_automaton(replacements)
+
+        # Replace in every body paragraph, including table cells, in one XPath walk
+        # (all placeholders of a paragraph in one pass)
+        for p, text in zip(paragraphs, paragraph_texts):
+            if '{{' not in text:
+                continue  # Most paragraphs (and table cells) hold no placeholder at all
+            DOCXFiller._replace_in_paragraph(Paragraph(p, body), replacements, cv_data, automaton)
 
         # Save filled document
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(Path(output_path).parent)
         doc.save(output_path)
 
         print(f"✓ Document saved: {output_path}")
@@ -129,7 +180,7 @@ class DOCXFiller:
         """
         Build replacement dictionary from CV data
 
-        Converts CV data structure to placeholder mappings:
+        Converts CV data structure to placeholder mappings (values are always strings):
         cv_data['personal_info']['name'] -> {{NAME}}
         cv_data['education'][0]['school'] -> {{EDU_1_SCHOOL}}
         """
@@ -247,318 +298,256 @@ class DOCXFiller:
                         combined = '\n'.join(descriptions)
                         replacements[f'{{{{PROJ_{idx}_DESC}}}}'] = combined
 
-        return replacements
+        # Stringify values once (YAML may give ints/dates/None) and intern the keys
+        return {sys.intern(key): '' if value is None else str(value) for key, value in replacements.items()}
 
     @staticmethod
-    def _replace_in_paragraph(paragraph, replacements: Dict[str, str], cv_data: Dict[str, Any] = None):
+    def _build_automaton(replacements: Dict[str, str]):
+        """
+        Build an Aho-Corasick automaton over the placeholder keys
+
+        Finds every placeholder in a text with a single linear pass,
+        instead of one substring scan per placeholder. Without pyahocorasick,
+        returns a single compiled regex alternation (longest keys first) instead.
+        """
+        if ahocorasick is None:
+            if not replacements:
+                return None  # No placeholders at all
+            return re.compile('|'.join(map(re.escape, sorted(replacements, key=len, reverse=True))))
+
+        automaton = ahocorasick.Automaton()
+        for placeholder, value in replacements.items():
+            automaton.add_word(placeholder, (placeholder, value))
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _find_placeholders(automaton, text: str, replacements: Dict[str, str]) -> list:
+        """
+        Find every placeholder in text in a single pass
+
+        Args:
+            automaton: Matcher from _build_automaton
+            text: Text to search
+            replacements: Placeholder to value mapping (used by the regex fallback)
+
+        Returns:
+            List of (position, placeholder, value) tuples sorted by position
+        """
+        if ahocorasick is None:
+            if automaton is None:
+                return []  # No placeholders at all
+            return [(m.start(), m.group(), replacements[m.group()]) for m in automaton.finditer(text)]
+
+        if automaton.kind != ahocorasick.AHOCORASICK:
+            return []  # No placeholders at all
+
+        return sorted(
+            (end - len(placeholder) + 1, placeholder, value)
+            for end, (placeholder, value) in automaton.iter(text)
+        )
+
+    @staticmethod
+    def _replace_in_paragraph(paragraph, replacements: Dict[str, str], cv_data: Dict[str, Any] = None,
+                              automaton=None):
         """
         Replace placeholders while preserving run-level formatting
 
         Strategy: Each run keeps its own formatting, we only replace text content
         For GITHUB and LINKEDIN, create hyperlinks instead of plain text
         """
-        full_text = paragraph.text
-
-        # Check if there are any placeholders
-        has_placeholder = any(placeholder in full_text for placeholder in replacements.keys())
-        if not has_placeholder:
+        # Cheap reject straight from the XML text nodes: every placeholder contains '{{'
+        if '{{' not in ''.join(paragraph._p.itertext()):
             return
 
-        # Build a mapping using paragraph.text to get correct positions
-        # We need to account for BOTH runs and hyperlink elements
-        char_map = []
+        if automaton is None:
+            automaton = DOCXFiller._build_automaton(replacements)
+
+        # Build the paragraph text from its runs and hyperlink elements, recording
+        # where each element's text starts so positions map back to elements
         elements = []  # List of (element, type, text) tuples
-        text_position = 0  # Current position in paragraph.text
-
-        import sys
-        for elem in paragraph._element:
-            if elem.tag.endswith('}r'):  # Run element
-                # Find corresponding run object
-                for run in paragraph.runs:
-                    if run._element == elem:
-                        run_text = run.text
-                        elements.append((run, 'run', run_text))
-                        for char_offset in range(len(run_text)):
-                            char_map.append((len(elements) - 1, 'run', char_offset))
-                            text_position += 1
-                        break
-            elif elem.tag.endswith('}hyperlink'):  # Hyperlink element
-                # Get the actual displayed text from paragraph.text
-                # We'll extract just the visible text length by checking paragraph.text
-                # Find how many chars this hyperlink contributes to paragraph.text
-                hyperlink_runs = [r for r in elem.iter() if r.tag.endswith('}r')]
-                hyperlink_text_parts = []
-                for hr in hyperlink_runs:
-                    for t in hr.iter():
-                        if t.tag.endswith('}t') and t.text:
-                            hyperlink_text_parts.append(t.text)
-                            break  # Only take first text element per run
-
-                hyperlink_display_text = ''.join(hyperlink_text_parts)
+        elem_starts = []  # Position in full_text where each element's text starts
+        text_position = 0  # Current position in full_text
+
+        # Run wrappers by element; the dict keeps the lxml proxies alive so ids stay stable
+        run_by_elem = {id(run._element): run for run in paragraph.runs}
+
+        for elem in _CHILDREN_XPATH(paragraph._element):
+            if elem.tag == _R:  # Run element
+                run = run_by_elem.get(id(elem))
+                if run is not None:
+                    run_text = run.text
+                    elements.append((run, 'run', run_text))
+                    elem_starts.append(text_position)
+                    text_position += len(run_text)
+            else:  # Hyperlink element
+                # Only the first text element of each hyperlink run is counted
+                hyperlink_display_text = ''.join(t.text for t in _HYPERLINK_TEXT_XPATH(elem))
                 elements.append((elem, 'hyperlink', hyperlink_display_text))
-                for char_offset in range(len(hyperlink_display_text)):
-                    char_map.append((len(elements) - 1, 'hyperlink', char_offset))
-                    text_position += 1
+                elem_starts.append(text_position)
+                text_position += len(hyperlink_display_text)
 
         if not elements:
             return
 
-        # Find all placeholders and their positions
-        replacements_to_apply = []
-        for placeholder, value in replacements.items():
-            pos = full_text.find(placeholder)
-            if pos != -1:
-                replacements_to_apply.append((pos, placeholder, value))
+        # Text the element offsets refer to, joined from the walk instead of re-reading paragraph.text
+        full_text = ''.join(elem_text for _, _, elem_text in elements)
 
+        # Find all placeholders and their positions (sorted, start to end)
+        replacements_to_apply = DOCXFiller._find_placeholders(automaton, full_text, replacements)
         if not replacements_to_apply:
             return
 
-        # Sort by position (process from start to end)
-        replacements_to_apply.sort()
-
-        # Process first placeholder
-        pos, placeholder, value = replacements_to_apply[0]
-
-        # Check if this is a hyperlink placeholder
-        is_hyperlink = placeholder in ['{{GITHUB}}', '{{LINKEDIN}}']
+        # Template run for replacements that don't start inside a run (find first run element)
+        first_run = None
+        for elem, elem_type, _ in elements:
+            if elem_type == 'run':
+                first_run = elem
+                break
 
-        if is_hyperlink and cv_data:
-            # Handle hyperlink specially
-            if pos >= len(char_map):
-                return
+        if first_run is None:
+            return
 
-            start_elem_idx, start_elem_type, start_offset = char_map[pos]
+        # Map each placeholder to (element index, offset within element) for its start and end
+        spans = []
+        cursor_pos = 0  # End of the previous placeholder in full_text
+        for pos, placeholder, value in replacements_to_apply:
             placeholder_end = pos + len(placeholder)
-
-            if placeholder_end - 1 < len(char_map):
-                end_elem_idx, end_elem_type, _ = char_map[placeholder_end - 1]
-            else:
-                end_elem_idx = start_elem_idx
-                end_elem_type = start_elem_type
-
-            # Get template run for formatting (find first run element)
-            template_run = None
-            for elem, elem_type, _ in elements:
-                if elem_type == 'run':
-                    template_run = elem
-                    break
-
-            if template_run is None:
-                return
-
-            # Get URL and display text
-            if placeholder == '{{GITHUB}}':
-                url = cv_data.get('personal_info', {}).get('github', '')
-                display_text = 'Github'
-            else:  # LINKEDIN
-                url = cv_data.get('personal_info', {}).get('linkedin', '')
-                display_text = 'Linkedin'
-
-            # Build new content: elements before + hyperlink + elements after
-            new_content = []
-
-            # Elements before the placeholder
-            for idx in range(start_elem_idx):
-                elem, elem_type, elem_text = elements[idx]
-                if elem_type == 'run':
-                    if elem_text:
-                        new_content.append(('text', elem_text, elem))
-                elif elem_type == 'hyperlink':
-                    new_content.append(('existing_hyperlink', elem))
-
-            # Text before placeholder in the start element
-            start_elem, start_elem_type, start_elem_text = elements[start_elem_idx]
-            if start_elem_type == 'run':
-                text_before = start_elem.text[:start_offset]
-                if text_before:
-                    new_content.append(('text', text_before, start_elem))
-
-            # The new hyperlink
-            new_content.append(('hyperlink', display_text, template_run, url))
-
-            # Text after placeholder in the end element
-            if end_elem_idx < len(elements):
-                end_elem, end_elem_type, end_elem_text = elements[end_elem_idx]
-                if end_elem_type == 'run':
-                    # Calculate how many characters we've consumed
-                    chars_before_end = sum(
-                        len(elements[i][2])  # elements[i][2] is the text
-                        for i in range(end_elem_idx)
-                    )
-                    end_offset = placeholder_end - chars_before_end
-                    text_after = end_elem.text[end_offset:]
-                    if text_after:
-                        new_content.append(('text', text_after, end_elem))
-
-            # Elements after the placeholder
-            for idx in range(end_elem_idx + 1, len(elements)):
-                elem, elem_type, elem_text = elements[idx]
-                if elem_type == 'run':
-                    if elem_text:
-                        new_content.append(('text', elem_text, elem))
-                elif elem_type == 'hyperlink':
-                    new_content.append(('existing_hyperlink', elem))
-
-            # Save paragraph properties before clearing
-            para_alignment = paragraph.alignment
-            para_style = paragraph.style
-
-            # Save entire pPr (paragraph properties) element
-            pPr = paragraph._element.pPr
-            saved_pPr = None
-            if pPr is not None:
-                from copy import deepcopy
-                saved_pPr = deepcopy(pPr)
-
-            # Clear paragraph content (but keep pPr)
-            for elem in list(paragraph._p):
-                if not elem.tag.endswith('}pPr'):
-                    paragraph._p.remove(elem)
-
-            # If we had saved pPr, restore it
-            if saved_pPr is not None:
-                # Remove current pPr and replace with saved one
-                current_pPr = paragraph._element.pPr
-                if current_pPr is not None:
-                    paragraph._p.remove(current_pPr)
-                paragraph._p.insert(0, saved_pPr)
-
-            # Rebuild paragraph with all elements
-            for item in new_content:
-                if item[0] == 'text':
-                    _, text, source_run = item
-                    new_run = paragraph.add_run(text)
-                    new_run.font.name = source_run.font.name
-                    new_run.font.size = source_run.font.size
-                    new_run.font.bold = source_run.font.bold
-                    new_run.font.italic = source_run.font.italic
-                elif item[0] == 'hyperlink':
-                    _, display_text, source_run, url = item
-                    DOCXFiller._add_hyperlink(paragraph, display_text, url, source_run)
-                elif item[0] == 'existing_hyperlink':
-                    _, hyperlink_elem = item
-                    # Re-append existing hyperlink element
-                    paragraph._p.append(hyperlink_elem)
-
+            if pos < cursor_pos or placeholder_end > text_position:
+                continue  # Overlaps the previous placeholder or out of range
+
+            start_elem_idx = bisect_right(elem_starts, pos) - 1
+            start_offset = pos - elem_starts[start_elem_idx]
+            end_elem_idx = bisect_right(elem_starts, placeholder_end - 1) - 1
+            end_offset = placeholder_end - elem_starts[end_elem_idx]
+            spans.append((placeholder, value, start_elem_idx, start_offset, end_elem_idx, end_offset))
+            cursor_pos = placeholder_end
+
+        # Fast path: every placeholder sits inside a single run and none becomes a
+        # hyperlink, so rewrite those runs' text in place and keep the XML as is
+        if all(start_idx == end_idx and elements[start_idx][1] == 'run'
+               and not (cv_data and placeholder in ('{{GITHUB}}', '{{LINKEDIN}}'))
+               for placeholder, _, start_idx, _, end_idx, _ in spans):
+            DOCXFiller._replace_in_runs(elements, spans)
             return
 
-        # Find which elements the placeholder spans (for non-hyperlink placeholders)
-        placeholder_end = pos + len(placeholder)
-
-        if pos >= len(char_map):
-            return
+        # Walk the paragraph once, left to right: copy content up to the next
+        # placeholder, emit its replacement, skip to the placeholder end, repeat
+        new_content = []
+        cursor_idx, cursor_offset = 0, 0  # First element/offset not yet copied
 
-        start_elem_idx, start_elem_type, start_offset = char_map[pos]
-        end_elem_idx = start_elem_idx
-        end_elem_type = start_elem_type
+        for placeholder, value, start_elem_idx, start_offset, end_elem_idx, end_offset in spans:
+            start_elem, start_elem_type, _ = elements[start_elem_idx]
 
-        if placeholder_end - 1 < len(char_map):
-            end_elem_idx, end_elem_type, _ = char_map[placeholder_end - 1]
+            # Content between the previous placeholder and this one
+            DOCXFiller._copy_elements(new_content, elements, cursor_idx, cursor_offset, start_elem_idx, start_offset)
 
-        # Get the template run for formatting
-        start_elem, _, start_elem_text = elements[start_elem_idx]
-        template_run = start_elem if start_elem_type == 'run' else None
+            # Check if this is a hyperlink placeholder
+            is_hyperlink = placeholder in ['{{GITHUB}}', '{{LINKEDIN}}']
 
-        # If placeholder starts in hyperlink, find a run for template
-        if template_run is None:
-            for elem, elem_type, _ in elements:
-                if elem_type == 'run':
-                    template_run = elem
-                    break
+            if is_hyperlink and cv_data:
+                # Get URL and display text
+                if placeholder == '{{GITHUB}}':
+                    url = cv_data.get('personal_info', {}).get('github', '')
+                    display_text = 'Github'
+                else:  # LINKEDIN
+                    url = cv_data.get('personal_info', {}).get('linkedin', '')
+                    display_text = 'Linkedin'
 
-        if template_run is None:
-            return
+                new_content.append(('hyperlink', display_text, first_run, url))
+            else:
+                # The replacement value takes the formatting of the run it starts in
+                template_run = start_elem if start_elem_type == 'run' else first_run
+                new_content.append(('text', value, template_run))
 
-        # Build new content
-        new_content = []
+            cursor_idx, cursor_offset = end_elem_idx, end_offset
 
-        # Elements before the placeholder
-        for idx in range(start_elem_idx):
-            elem, elem_type, elem_text = elements[idx]
-            if elem_type == 'run':
-                if elem_text:
-                    new_content.append(('text', elem_text, elem))
-            elif elem_type == 'hyperlink':
-                new_content.append(('existing_hyperlink', elem))
+        # Content after the last placeholder
+        DOCXFiller._copy_elements(new_content, elements, cursor_idx, cursor_offset, len(elements), 0)
 
-        # Text before placeholder in the start element
-        if start_elem_type == 'run':
-            text_before = start_elem.text[:start_offset]
-            if text_before:
-                new_content.append(('text', text_before, start_elem))
-
-        # The replacement value with template formatting
-        new_content.append(('text', str(value), template_run))
-
-        # Text after placeholder in the end element
-        if end_elem_idx < len(elements):
-            end_elem, end_elem_type, end_elem_text = elements[end_elem_idx]
-            if end_elem_type == 'run':
-                # Calculate how many characters we've consumed
-                chars_before_end = sum(
-                    len(elements[i][2])  # elements[i][2] is the text
-                    for i in range(end_elem_idx)
-                )
-                end_offset = placeholder_end - chars_before_end
-                text_after = end_elem.text[end_offset:]
-                if text_after:
-                    new_content.append(('text', text_after, end_elem))
-
-        # Elements after the placeholder
-        for idx in range(end_elem_idx + 1, len(elements)):
-            elem, elem_type, elem_text = elements[idx]
-            if elem_type == 'run':
-                if elem_text:
-                    new_content.append(('text', elem_text, elem))
-            elif elem_type == 'hyperlink':
-                new_content.append(('existing_hyperlink', elem))
+        # Clear paragraph content in place, keeping pPr (paragraph properties, always the first child)
+        p = paragraph._p
+        keep_start = 1 if len(p) and p[0].tag == _PPR else 0
+        del p[keep_start:]
 
-        # Save paragraph properties before clearing
-        para_alignment = paragraph.alignment
-        para_style = paragraph.style
-
-        # Save entire pPr (paragraph properties) element
-        pPr = paragraph._element.pPr
-        saved_pPr = None
-        if pPr is not None:
-            from copy import deepcopy
-            saved_pPr = deepcopy(pPr)
-
-        # Clear paragraph content (but keep pPr)
-        for elem in list(paragraph._p):
-            if not elem.tag.endswith('}pPr'):
-                paragraph._p.remove(elem)
-
-        # If we had saved pPr, restore it
-        if saved_pPr is not None:
-            # Remove current pPr and replace with saved one
-            current_pPr = paragraph._element.pPr
-            if current_pPr is not None:
-                paragraph._p.remove(current_pPr)
-            paragraph._p.insert(0, saved_pPr)
-
-        # Rebuild paragraph with all elements
+        # Rebuild paragraph with all elements, attached in a single extend
+        new_children = []
         for item in new_content:
             if item[0] == 'text':
                 _, text, source_run = item
-                new_run = paragraph.add_run(text)
-                new_run.font.name = source_run.font.name
-                new_run.font.size = source_run.font.size
-                new_run.font.bold = source_run.font.bold
-                new_run.font.italic = source_run.font.italic
-                new_run.font.underline = source_run.font.underline
-                if source_run.font.color and source_run.font.color.rgb:
-                    new_run.font.color.rgb = source_run.font.color.rgb
+                new_children.append(DOCXFiller._clone_run_with_text(source_run._element, text))
+            elif item[0] == 'hyperlink':
+                _, display_text, source_run, url = item
+                new_children.append(DOCXFiller._build_hyperlink(paragraph.part, display_text, url, source_run))
             elif item[0] == 'existing_hyperlink':
                 _, hyperlink_elem = item
-                # Re-append existing hyperlink element
-                paragraph._p.append(hyperlink_elem)
+                # Re-attach existing hyperlink element
+                new_children.append(hyperlink_elem)
+        p.extend(new_children)
 
+    @staticmethod
+    def _clone_run_with_text(template_run_elem, text: str):
+        """
+        Copy a <w:r> element, keeping its formatting (rPr) but replacing its content with text
+
+        Args:
+            template_run_elem: Run element to copy formatting from
+            text: Text for the new run (tabs and line breaks become w:tab/w:br)
+
+        Returns:
+            The new run element
+        """
+        r = deepcopy(template_run_elem)
+        r.text = text  # CT_R clears everything except rPr before adding the text
+        return r
+
+    @staticmethod
+    def _replace_in_runs(elements: list, spans: list):
+        """
+        Replace placeholders that each lie within a single run by rewriting the run text
+
+        Args:
+            elements: Paragraph elements as (element, type, text) tuples
+            spans: Placeholders as (placeholder, value, start_idx, start_offset, end_idx, end_offset),
+                sorted and non-overlapping, with start_idx == end_idx pointing at a run
+        """
+        parts = []
+        run_idx, cursor = None, 0
+        for _, value, idx, start_offset, _, end_offset in spans:
+            if idx != run_idx:
+                if run_idx is not None:
+                    parts.append(elements[run_idx][2][cursor:])
+                    elements[run_idx][0].text = ''.join(parts)
+                parts, run_idx, cursor = [], idx, 0
+            parts.append(elements[idx][2][cursor:start_offset])
+            parts.append(value)
+            cursor = end_offset
+
+        if run_idx is not None:
+            parts.append(elements[run_idx][2][cursor:])
+            elements[run_idx][0].text = ''.join(parts)
+
+    @staticmethod
+    def _copy_elements(new_content: list, elements: list, from_idx: int, from_offset: int, to_idx: int, to_offset: int):
+        """
+        Append the paragraph content between two (element index, offset) positions to new_content
+
+        Runs are sliced to the range; existing hyperlinks are only kept when entirely inside it.
+        """
+        for idx in range(from_idx, min(to_idx + 1, len(elements))):
+            elem, elem_type, elem_text = elements[idx]
+            start = from_offset if idx == from_idx else 0
+            end = to_offset if idx == to_idx else len(elem_text)
+
+            if elem_type == 'run':
+                text = elem_text[start:end]
+                if text:
+                    new_content.append(('text', text, elem))
+            elif elem_type == 'hyperlink' and start == 0 and end == len(elem_text):
+                new_content.append(('existing_hyperlink', elem))
 
 # Example usage and testing
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) < 4:
         print("Usage: python src/docx_filler.py <template_path> <cv_yaml_path> <output_path>")
         print("Example: python src/docx_filler.py templates/template.docx outputs/customized_cv.yaml outputs/customized_cv.docx")
@@ -570,7 +559,7 @@ if __name__ == "__main__":
 
     # Load CV data
     with open(cv_yaml_path, 'r') as f:
-        cv_data = yaml.safe_load(f)
+        cv_data = yaml.load(f, Loader=CSafeLoader)
 
     print(f"Template: {template_path}")
     print(f"CV Data: {cv_yaml_path}")
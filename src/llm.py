@@ -0,0 +1,121 @@
+"""
+LLM wrapper for the CV customization system.
+Marks the static prompt prefix (up to the CV) as cacheable so providers reuse the prefill.
+"""
+
+import contextvars
+import functools
+import os
+from crewai import LLM
+import litellm
+from typing import Callable, Optional
+
+# Default model used by all agents (override with CV_AGENT_MODEL)
+DEFAULT_MODEL = os.getenv("CV_AGENT_MODEL", "anthropic/claude-3-5-sonnet-20241022")
+
+# Providers that honour explicit cache_control checkpoints
+CACHE_CONTROL_PROVIDERS = ("anthropic/", "bedrock/", "vertex_ai/", "gemini/")
+
+# Closing tag of the CV block in task prompts; everything up to it is static
+CV_BOUNDARY = "</CV>"
+
+# Anthropic refuses to cache prefixes shorter than this many tokens
+MIN_CACHEABLE_TOKENS = 1024
+
+# Receives generated text chunks from streaming LLMs while set (see JobCVCrew.customize_cv_for_job_stream)
+stream_sink: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "stream_sink", default=None
+)
+
+
+class CachingLLM(LLM):
+    """crewai LLM that adds ephemeral cache_control checkpoints to the static prompt prefix"""
+
+    def __init__(self, *args, streaming: bool = False, **kwargs):
+        """
+        Args:
+            streaming: Stream completions to stream_sink when one is set
+        """
+        super().__init__(*args, **kwargs)
+        self.streaming = streaming
+
+    def call(self, messages, *args, **kwargs):
+        if isinstance(messages, list) and self.model.startswith(CACHE_CONTROL_PROVIDERS):
+            messages = self._mark_cacheable(messages)
+
+        sink = stream_sink.get()
+        if self.streaming and sink is not None and isinstance(messages, list):
+            return self._stream_call(messages, sink)
+        return super().call(messages, *args, **kwargs)
+
+    def _stream_call(self, messages: list, sink: Callable[[str], None]) -> str:
+        """Run the completion with streaming, forwarding each chunk to sink, and return the full text"""
+        params = {"model": self.model, "messages": messages, "stream": True, **self.additional_params}
+        for name in ("temperature", "top_p", "max_tokens", "stop", "base_url", "api_key"):
+            value = getattr(self, name, None)
+            if value is not None:
+                params[name] = value
+
+        chunks = []
+        for chunk in litellm.completion(**params):
+            text = chunk.choices[0].delta.content
+            if text:
+                chunks.append(text)
+                sink(text)
+        return "".join(chunks)
+
+    def _mark_cacheable(self, messages: list) -> list:
+        """
+        Return a copy of messages with a cache checkpoint on the static prefix
+
+        The checkpoint goes on the task prompt right after the closing </CV>
+        tag, so the system prompt (role, goal, backstory) and the CV are cached
+        together. The system prompt alone is far below the provider minimum, so
+        it gets no checkpoint of its own. The job posting and anything after
+        it stay outside the cache boundary.
+        """
+        marked = list(messages)
+        prefix = ""
+        for idx, message in enumerate(marked):
+            content = message.get("content")
+            if not isinstance(content, str):
+                break
+
+            if message.get("role") == "user" and CV_BOUNDARY in content:
+                head, _, tail = content.partition(CV_BOUNDARY)
+                head += CV_BOUNDARY
+                if self._is_cacheable(prefix + head):
+                    blocks = [self._cached_block(head)]
+                    if tail:
+                        blocks.append({"type": "text", "text": tail})
+                    marked[idx] = {**message, "content": blocks}
+                break
+
+            prefix += content
+
+        return marked
+
+    def _is_cacheable(self, text: str) -> bool:
+        """Check the text meets the provider's minimum cacheable prefix length"""
+        return _meets_cache_minimum(self.model, text)
+
+    @staticmethod
+    def _cached_block(text: str) -> dict:
+        """Build a text content block carrying an ephemeral cache checkpoint"""
+        return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+@functools.lru_cache(maxsize=64)
+def _meets_cache_minimum(model: str, text: str) -> bool:
+    """Token-count a prompt prefix once; the same static prefixes recur on every call"""
+    return litellm.token_counter(model=model, text=text) >= MIN_CACHEABLE_TOKENS
+
+
+def make_llm(model: str = DEFAULT_MODEL, **kwargs) -> CachingLLM:
+    """Create the LLM used by the agents (extra kwargs go to crewai.LLM, e.g. max_tokens)"""
+    llm = CachingLLM(model=model, **kwargs)
+    # crewai 1.x hands some providers to native clients from LLM.__new__, which
+    # would silently skip the cache checkpoints and streaming (requirements pin <1.0)
+    if not isinstance(llm, CachingLLM):
+        raise TypeError(f"crewai returned {type(llm).__name__} for {model}; CachingLLM needs the LiteLLM route")
+    return llm
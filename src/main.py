@@ -3,11 +3,13 @@ Main entry point for the Job CV Customization System.
 This demonstrates how to use the CrewAI-based system to customize CVs.
 """
 
+import asyncio
 import os
 from dotenv import load_dotenv
-from crew import JobCVCrew
+from crew import JobCVCrew, analyze_job
 from utils import JobPostingMocker, CVParser
 from pathlib import Path
+from typing import Tuple
 
 
 def setup_environment():
@@ -22,6 +24,24 @@ def setup_environment():
     Path("outputs").mkdir(exist_ok=True)
 
 
+async def run(job_posting: str, cv_path: str = "inputs/base_cv.yaml") -> Tuple[JobCVCrew, str]:
+    """
+    Customize the CV for one job posting
+
+    The job analysis only needs the posting, so its LLM round-trip runs while
+    the base CV is loaded; matching and customization then run in sequence.
+
+    Returns:
+        Tuple of (crew, customized CV as a YAML string)
+    """
+    crew, job_analysis = await asyncio.gather(
+        asyncio.to_thread(JobCVCrew, cv_path=cv_path),
+        analyze_job(job_posting),
+    )
+    customized_cv = await asyncio.to_thread(crew.customize_cv_for_job, job_posting, job_analysis)
+    return crew, customized_cv
+
+
 def main():
     """Main execution function"""
     print("\n" + "="*70)
@@ -31,13 +51,8 @@ def main():
     # Setup
     setup_environment()
     
-    # Initialize the crew with base CV and template
-    print("1. Initializing Crew with base CV and template...")
-    crew = JobCVCrew(cv_path="inputs/base_cv.yaml")
-    
-    
     # Get a sample job posting
-    print("\n2. Loading sample job posting...")
+    print("1. Loading sample job posting...")
     sample_postings = JobPostingMocker.get_sample_postings()
     
     # Choose which job posting to customize for
@@ -47,21 +62,21 @@ def main():
     print(f"   Selected job: {job_key}")
     print(f"   Preview: {job_posting[:100]}...")
     
-    # Run the customization workflow
-    print("\n3. Starting CV customization workflow...")
+    # Run the customization workflow (base CV loads while the job is analyzed)
+    print("\n2. Loading base CV and starting CV customization workflow...")
     print("-" * 70)
     
     try:
-        customized_cv = crew.customize_cv_for_job(job_posting)
+        crew, customized_cv = asyncio.run(run(job_posting))
 
         print("-" * 70)
-        print("\n4. Saving customized CV...")
+        print("\n3. Saving customized CV...")
         yaml_path = crew.save_customized_cv(customized_cv)
 
-        print("\n5. Generating DOCX resume...")
+        print("\n4. Generating DOCX resume...")
         docx_path = crew.generate_docx(yaml_path)
 
-        print("\n6. Converting to PDF...")
+        print("\n5. Converting to PDF...")
         pdf_path = crew.generate_pdf(docx_path)
 
         print("\n" + "="*70)
@@ -1,102 +1,231 @@
 """
 Task definitions for the CV customization system.
 Each task is assigned to an agent and defines the work to be done.
+
+Prompts are ordered static-first, dynamic-last: fixed instructions, then the
+candidate CV (stable across a session), then the job posting. Keeping the
+CV ahead of the posting makes it part of the provider's cacheable prefix,
+and llm.CachingLLM places a cache checkpoint right after the closing </CV>.
 """
 
-from crewai import Task
-from agents import job_analyzer_agent, cv_matcher_agent, cv_customizer_agent
+from typing import TYPE_CHECKING, Tuple
+
+# crewai is imported when tasks are built, not when this module is imported
+if TYPE_CHECKING:
+    from crewai import Agent, Task
 
-# =====================================================
-# TASK 1: Analyze Job Posting
-# =====================================================
-analyze_job_task = Task(
-    description="""Analyze the following job posting and provide a comprehensive breakdown:
-    
-    {job_posting}
-    
-    Your analysis should include:
-    1. Job title and company overview
-    2. Core responsibilities and duties
-    3. Required skills and qualifications
-    4. Nice-to-have skills and experience
-    5. Implicit requirements (culture, work style, etc.)
-    6. Key keywords and phrases that appear frequently
-    7. Seniority level and career expectations
-    
-    Format the output as structured data that can be easily compared with a CV.""",
-    agent=job_analyzer_agent,
-    expected_output="Comprehensive job analysis with structured requirements and skills breakdown",
-)
 
 # =====================================================
-# TASK 2: Match CV with Job Requirements
+# Prompt templates
 # =====================================================
-match_cv_task = Task(
-    description="""Compare the candidate's CV with the job requirements and provide a detailed analysis:
+# Each description is one template written flush left, so no source
+# indentation is sent as prompt tokens; crewai fills the {placeholders} when
+# the crew is kicked off. The tailoring prompts all end with TAILORING_INPUTS,
+# which keeps the closing </CV> (the cache boundary) in one place.
 
-    Candidate CV:
-    {candidate_cv}
+# Per-run inputs of the tailoring prompts: the CV first (cached prefix), then the job
+TAILORING_INPUTS = """<CV>{original_cv}</CV>
+<JOB>{job_posting}</JOB>
+<JOB_ANALYSIS>{job_analysis}</JOB_ANALYSIS>"""
 
-    Use the job analysis from the previous task to understand the requirements.
+ANALYZE_JOB_DESCRIPTION = """Analyze the following job posting and provide a comprehensive breakdown:
 
-    Your analysis should include:
-    1. Matching skills (what the candidate has that the job requires)
-    2. Skill gaps (what the job requires that the candidate doesn't have)
-    3. Experience alignment (relevant work experience)
-    4. Opportunity areas (where to position strengths)
-    5. Potential concerns or misalignments
-    6. Overall fit assessment (high/medium/low fit)
-    7. Specific recommendations for what to emphasize in the tailored CV
+{job_posting}
 
-    Be strategic and practical in your assessment.""",
-    agent=cv_matcher_agent,
-    expected_output="Detailed matching analysis with specific recommendations for CV customization",
-    context=[analyze_job_task],  # Use output from previous task
-)
+Your analysis should include:
+1. Job title and company overview
+2. Core responsibilities and duties
+3. Required skills and qualifications
+4. Nice-to-have skills and experience
+5. Implicit requirements (culture, work style, etc.)
+6. Key keywords and phrases that appear frequently
+7. Seniority level and career expectations
 
-# =====================================================
-# TASK 3: Generate Customized CV
-# =====================================================
-customize_cv_task = Task(
-    description="""Create a customized YAML CV based on the original CV and the matching analysis:
-
-    Original CV:
-    {original_cv}
-
-    Use the matching analysis from the previous task to guide your customization.
-
-    CRITICAL CONSTRAINTS - YOU MUST FOLLOW THESE RULES:
-
-    1. SKILLS INTEGRITY:
-       - ONLY use skills, technologies, and tools that are ALREADY in the original CV
-       - NEVER add new skills that don't exist in the original CV (e.g., if TensorFlow is not in original, DON'T add it)
-       - You can REORDER skills to prioritize relevant ones, but CANNOT invent new ones
-       - You can REMOVE less relevant skills, but CANNOT add fabricated ones
-
-    2. TECHNICAL DETAIL PRESERVATION:
-       - KEEP all technical details, specific technologies, and version numbers from original
-       - DO NOT simplify or generalize technical descriptions
-       - PRESERVE all project-specific technologies and implementation details
-       - Maintain the depth and specificity of technical achievements
-
-    3. OUTPUT FORMAT:
-       - Output ONLY pure YAML content - NO explanatory text before or after
-       - NO markdown code blocks (no ```yaml or ```)
-       - NO introductory sentences like "Here is the customized CV:"
-       - NO concluding remarks or explanations
-       - Start directly with YAML (e.g., "personal_info:")
-       - End with the last YAML field - nothing else
-
-    4. CUSTOMIZATION APPROACH:
-       - Reorganize CV sections to prioritize relevant experience
-       - Rewrite bullet points to emphasize relevant achievements using EXISTING skills
-       - Reorder skills to highlight those matching job requirements
-       - Keep all information truthful and authentic
-       - Maintain the same YAML structure as the original
-       - Enhance impact and relevance WITHOUT fabricating new information
-
-    Your output must be valid YAML that can be directly parsed by yaml.safe_load() without any preprocessing.""",
-    agent=cv_customizer_agent,
-    expected_output="Pure YAML content only - no explanatory text, starting with 'personal_info:' and ending with the last YAML field",
-    context=[analyze_job_task, match_cv_task],  # Use outputs from previous tasks
-)
+Format the output as structured data that can be easily compared with a CV."""
+
+MATCH_CV_DESCRIPTION = """Compare the candidate's CV with the job requirements and provide a detailed analysis.
+
+Use the job analysis to understand the requirements.
+
+Your analysis should include:
+1. Matching skills (what the candidate has that the job requires)
+2. Skill gaps (what the job requires that the candidate doesn't have)
+3. Experience alignment (relevant work experience)
+4. Opportunity areas (where to position strengths)
+5. Potential concerns or misalignments
+6. Overall fit assessment (high/medium/low fit)
+7. Specific recommendations for what to emphasize in the tailored CV
+
+Be strategic and practical in your assessment.
+
+The candidate's CV (as JSON) is inside <CV> tags, the job posting inside <JOB> tags and its analysis inside <JOB_ANALYSIS> tags:
+
+""" + TAILORING_INPUTS
+
+CUSTOMIZE_CV_DESCRIPTION = """Create a customized YAML CV based on the original CV and the matching analysis.
+
+Use the job analysis and the matching analysis from the previous task to guide your customization.
+
+CRITICAL CONSTRAINTS - YOU MUST FOLLOW THESE RULES:
+
+1. SKILLS INTEGRITY:
+   - ONLY use skills, technologies, and tools that are ALREADY in the original CV
+   - NEVER add new skills that don't exist in the original CV (e.g., if TensorFlow is not in original, DON'T add it)
+   - You can REORDER skills to prioritize relevant ones, but CANNOT invent new ones
+   - You can REMOVE less relevant skills, but CANNOT add fabricated ones
+
+2. TECHNICAL DETAIL PRESERVATION:
+   - KEEP all technical details, specific technologies, and version numbers from original
+   - DO NOT simplify or generalize technical descriptions
+   - PRESERVE all project-specific technologies and implementation details
+   - Maintain the depth and specificity of technical achievements
+
+3. OUTPUT FORMAT:
+   - Output ONLY pure YAML content - NO explanatory text before or after
+   - NO markdown code blocks (no ```yaml or ```)
+   - NO introductory sentences like "Here is the customized CV:"
+   - NO concluding remarks or explanations
+   - Start directly with YAML (e.g., "personal_info:")
+   - End with the last YAML field - nothing else
+
+4. CUSTOMIZATION APPROACH:
+   - Reorganize CV sections to prioritize relevant experience
+   - Rewrite bullet points to emphasize relevant achievements using EXISTING skills
+   - Reorder skills to highlight those matching job requirements
+   - Keep all information truthful and authentic
+   - Maintain the same structure as the original CV (same field names and nesting), written as YAML
+   - Enhance impact and relevance WITHOUT fabricating new information
+
+Your output must be valid YAML that can be directly parsed by yaml.safe_load() without any preprocessing.
+
+The original CV (as JSON) is inside <CV> tags, the job posting inside <JOB> tags and its analysis inside <JOB_ANALYSIS> tags:
+
+""" + TAILORING_INPUTS
+
+# Fused variant: matching analysis and customized CV in one LLM call, returned as JSON
+ANALYZE_AND_CUSTOMIZE_DESCRIPTION = """Compare the candidate's CV with the job requirements, then create a customized YAML CV based on the original CV and your analysis.
+
+Use the job analysis to understand the requirements.
+
+Your analysis should include:
+1. Matching skills (what the candidate has that the job requires)
+2. Skill gaps (what the job requires that the candidate doesn't have)
+3. Experience alignment (relevant work experience)
+4. Opportunity areas (where to position strengths)
+5. Potential concerns or misalignments
+6. Overall fit assessment (high/medium/low fit)
+7. Specific recommendations for what to emphasize in the tailored CV
+
+Be strategic and practical in your assessment.
+
+Use your matching analysis to guide the customization.
+
+CRITICAL CONSTRAINTS - YOU MUST FOLLOW THESE RULES:
+
+1. SKILLS INTEGRITY:
+   - ONLY use skills, technologies, and tools that are ALREADY in the original CV
+   - NEVER add new skills that don't exist in the original CV (e.g., if TensorFlow is not in original, DON'T add it)
+   - You can REORDER skills to prioritize relevant ones, but CANNOT invent new ones
+   - You can REMOVE less relevant skills, but CANNOT add fabricated ones
+
+2. TECHNICAL DETAIL PRESERVATION:
+   - KEEP all technical details, specific technologies, and version numbers from original
+   - DO NOT simplify or generalize technical descriptions
+   - PRESERVE all project-specific technologies and implementation details
+   - Maintain the depth and specificity of technical achievements
+
+3. OUTPUT FORMAT:
+   - Output ONLY a single JSON object - NO explanatory text before or after, NO markdown code blocks
+   - The object has exactly two string fields: "analysis" and "customized_cv_yaml"
+   - "analysis" holds your matching analysis
+   - "customized_cv_yaml" holds the customized CV as pure YAML, starting with "personal_info:"
+
+4. CUSTOMIZATION APPROACH:
+   - Reorganize CV sections to prioritize relevant experience
+   - Rewrite bullet points to emphasize relevant achievements using EXISTING skills
+   - Reorder skills to highlight those matching job requirements
+   - Keep all information truthful and authentic
+   - Maintain the same structure as the original CV (same field names and nesting), written as YAML
+   - Enhance impact and relevance WITHOUT fabricating new information
+
+The "customized_cv_yaml" string must be valid YAML that can be directly parsed by yaml.safe_load() without any preprocessing.
+
+The original CV (as JSON) is inside <CV> tags, the job posting inside <JOB> tags and its analysis inside <JOB_ANALYSIS> tags:
+
+""" + TAILORING_INPUTS
+
+
+def make_analysis_task(job_analyzer_agent: "Agent") -> "Task":
+    """
+    Build the job analysis task
+
+    The analysis depends only on the job posting, so it runs as its own stage
+    and its output can be cached and reused across candidates.
+    """
+    from crewai import Task
+
+    # =====================================================
+    # TASK 1: Analyze Job Posting
+    # =====================================================
+    analyze_job_task = Task(
+        description=ANALYZE_JOB_DESCRIPTION,
+        agent=job_analyzer_agent,
+        expected_output="Comprehensive job analysis with structured requirements and skills breakdown",
+    )
+
+    return analyze_job_task
+
+
+def make_tailoring_tasks(cv_matcher_agent: "Agent", cv_customizer_agent: "Agent") -> Tuple["Task", "Task"]:
+    """
+    Build the CV matching and customization tasks
+
+    The job analysis from the first stage is passed in as the {job_analysis} input.
+
+    Returns:
+        Tuple of (match_cv_task, customize_cv_task)
+    """
+    from crewai import Task
+
+    # =====================================================
+    # TASK 2: Match CV with Job Requirements
+    # =====================================================
+    match_cv_task = Task(
+        description=MATCH_CV_DESCRIPTION,
+        agent=cv_matcher_agent,
+        expected_output="Detailed matching analysis with specific recommendations for CV customization",
+    )
+
+    # =====================================================
+    # TASK 3: Generate Customized CV
+    # =====================================================
+    customize_cv_task = Task(
+        description=CUSTOMIZE_CV_DESCRIPTION,
+        agent=cv_customizer_agent,
+        expected_output="Pure YAML content only - no explanatory text, starting with 'personal_info:' and ending with the last YAML field",
+        context=[match_cv_task],  # Use output from previous task
+    )
+
+    return match_cv_task, customize_cv_task
+
+
+def make_fused_tailoring_task(cv_customizer_agent: "Agent") -> "Task":
+    """
+    Build a single task that both matches and customizes the CV
+
+    Replaces the matching and customization tasks with one LLM round-trip that
+    carries the CV once. The answer is a JSON object with "analysis" and
+    "customized_cv_yaml" fields.
+    """
+    from crewai import Task
+
+    # =====================================================
+    # TASK 2+3 (fused): Match CV and Generate Customized CV
+    # =====================================================
+    analyze_and_customize_task = Task(
+        description=ANALYZE_AND_CUSTOMIZE_DESCRIPTION,
+        agent=cv_customizer_agent,
+        expected_output='A single JSON object with string fields "analysis" and "customized_cv_yaml" - no other text',
+    )
+
+    return analyze_and_customize_task
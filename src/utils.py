@@ -3,10 +3,340 @@ Utility functions for the Job CV Customization System.
 Includes LinkedIn scraping, CV parsing, and PDF generation.
 """
 
+import copy
+import json
+import os
+import re
+import sys
+import textwrap
+import time
 import yaml
+from functools import lru_cache
+from itertools import count
+from json.encoder import encode_basestring, encode_basestring_ascii
 from pathlib import Path
-from typing import Dict, Optional
-from datetime import datetime
+from types import MappingProxyType
+from typing import TYPE_CHECKING, List, Mapping, Optional, Set
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Prefer the libyaml-backed loader/dumper, fall back to pure Python if unavailable
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+    print("⚠ PyYAML was built without libyaml; CV parsing will use the slower pure-Python loader")
+
+# orjson serializes prompt CVs much faster; the stdlib json module is the fallback.
+# YAML allows non-string keys (ints, dates), so orjson runs with OPT_NON_STR_KEYS.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class _FastDumper(_Dumper):
+    """CV dumper with block style, original key order and no anchors/aliases built in"""
+
+    def __init__(self, stream, **kwargs):
+        kwargs['default_flow_style'] = False
+        kwargs['sort_keys'] = False
+        super().__init__(stream, **kwargs)
+
+    def ignore_aliases(self, data):
+        return True
+
+
+# Columns of CVParser.skills_table (one contiguous array per field)
+_SKILL_FIELDS = ('name', 'key', 'category')
+
+# Directories already created by ensure_dir during this process
+_ENSURED_DIRS: Set[Path] = set()
+
+
+def ensure_dir(path) -> Path:
+    """
+    Create a directory (and its parents) unless this process already did
+
+    Repeated saves into the same folder skip the mkdir syscalls after the
+    first one. A directory removed while the process runs is not recreated
+    here; write_atomic notices and creates it again.
+    """
+    path = Path(path)
+    if path not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+    return path
+
+
+def _json_default(obj):
+    """Serialize values JSON has no type for (YAML dates)"""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _parse_cv(data) -> dict:
+    """
+    Parse CV text or bytes, taking the JSON fast path when it looks like JSON
+
+    JSON is a subset of YAML, so a document starting with '{' is tried with
+    the JSON parser first and handed to the YAML loader only if that fails
+    (e.g. a flow mapping with unquoted keys).
+    """
+    if data.lstrip()[:1] in ('{', b'{'):
+        try:
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except ValueError:
+            pass
+
+    return yaml.load(data, Loader=_Loader) or {}
+
+
+# The cached trees are private: callers get deep copies, so nothing they
+# modify (nested lists and dicts included) leaks into later loads
+
+@lru_cache(maxsize=32)
+def _load_cv_cached(cv_path: str, mtime_ns: int) -> dict:
+    """Parse a CV file once per (path, modification time)"""
+    with open(cv_path, 'rb') as file:  # Both parsers read bytes directly, no text decoding pass
+        return _parse_cv(file.read())
+
+
+@lru_cache(maxsize=32)
+def _parse_cv_cached(cv_string: str) -> dict:
+    """Parse a CV YAML or JSON string once per distinct string"""
+    return _parse_cv(cv_string)
+
+
+# Flags for write_atomic's temp file: new file only, never follow an existing one
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+
+
+def _open_temp(path: Path):
+    """Create a uniquely named temp file next to path, returning (fd, temp path)"""
+    tmp_path = path.with_name(f"{path.name}.{os.urandom(6).hex()}.tmp")
+    # Mode 0o666 lets the process umask decide the permissions, as open() does
+    return os.open(tmp_path, _TMP_FLAGS, 0o666), tmp_path
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write bytes to path via a temp file and rename, so readers never see a partial file"""
+    ensure_dir(path.parent)
+    try:
+        fd, tmp_path = _open_temp(path)
+    except FileNotFoundError:
+        # Removed since ensure_dir created it: forget it, create it again and retry once
+        _ENSURED_DIRS.discard(path.parent)
+        ensure_dir(path.parent)
+        fd, tmp_path = _open_temp(path)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# =====================================================
+# CV YAML emitter
+# =====================================================
+# CVs are plain trees of dicts, lists and scalars, so they are written directly
+# instead of through yaml.dump's representer/serializer/emitter pipeline. The
+# layout follows inputs/base_cv.yaml: block style, original key order, lists
+# indented under their key and every string double-quoted. JSON string escapes
+# are valid in YAML double-quoted scalars.
+
+# Keys that can be written unquoted (but see _YAML_RESERVED)
+_PLAIN_KEY_RE = re.compile(r'[A-Za-z_][\w-]*\Z')
+_YAML_RESERVED = frozenset(('yes', 'no', 'true', 'false', 'on', 'off', 'null'))
+
+# Characters YAML won't accept literally inside a double-quoted scalar
+_YAML_UNPRINTABLE_RE = re.compile('[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]')
+
+
+def _yaml_str(value: str) -> str:
+    """Quote a string for YAML, escaping only what JSON escapes unless YAML needs more"""
+    if _YAML_UNPRINTABLE_RE.search(value):
+        return encode_basestring_ascii(value)
+    return encode_basestring(value)
+
+
+def _yaml_scalar(value) -> str:
+    """Format a scalar, raising TypeError for anything that isn't a plain CV value"""
+    if isinstance(value, str):
+        return _yaml_str(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, float):
+        if value != value:
+            return '.nan'
+        if value in (float('inf'), float('-inf')):
+            return '.inf' if value > 0 else '-.inf'
+        text = repr(value)
+        if '.' not in text and 'e' in text:
+            text = text.replace('e', '.0e')  # YAML 1.1 floats need a dot: 1e+16 -> 1.0e+16
+        return text
+    raise TypeError(f"cannot emit {type(value).__name__}")
+
+
+def _yaml_key(key) -> str:
+    if not isinstance(key, str):
+        raise TypeError(f"cannot emit {type(key).__name__} key")
+    if _PLAIN_KEY_RE.match(key) and key.lower() not in _YAML_RESERVED:
+        return key
+    return _yaml_str(key)
+
+
+def _emit_yaml(node, pad: str, lead: str, parts: List[str]) -> None:
+    """
+    Append the block-style YAML lines for a non-empty dict or list to parts
+
+    Args:
+        node: Dict or list to write
+        pad: Indentation of the node's lines
+        lead: Prefix for the first line instead of pad (pad with a "- " for list items)
+        parts: Output accumulator
+    """
+    first = True
+    if isinstance(node, Mapping):
+        for key, value in node.items():
+            line = (lead if first else pad) + _yaml_key(key) + ':'
+            first = False
+            if isinstance(value, (Mapping, list)) and value:
+                parts.append(line + '\n')
+                _emit_yaml(value, pad + '  ', pad + '  ', parts)
+            elif isinstance(value, Mapping):
+                parts.append(line + ' {}\n')
+            elif isinstance(value, list):
+                parts.append(line + ' []\n')
+            else:
+                parts.append(line + ' ' + _yaml_scalar(value) + '\n')
+    else:
+        for item in node:
+            item_lead = (lead if first else pad) + '- '
+            first = False
+            if isinstance(item, (Mapping, list)) and item:
+                _emit_yaml(item, pad + '  ', item_lead, parts)
+            elif isinstance(item, Mapping):
+                parts.append(item_lead + '{}\n')
+            elif isinstance(item, list):
+                parts.append(item_lead + '[]\n')
+            else:
+                parts.append(item_lead + _yaml_scalar(item) + '\n')
+
+
+def _dump_cv(cv_data) -> str:
+    """Serialize a CV to YAML, falling back to yaml.dump for values the emitter doesn't know"""
+    if isinstance(cv_data, Mapping) and cv_data:
+        parts: List[str] = []
+        try:
+            _emit_yaml(cv_data, '', '', parts)
+            return ''.join(parts)
+        except TypeError:
+            pass
+
+    return yaml.dump(cv_data, Dumper=_FastDumper)
+
+
+@lru_cache(maxsize=1)
+def _lev_kernels():
+    """
+    JIT-compile the bounded Levenshtein kernels with numba on first use
+
+    Strings are passed as uint32 code point arrays; a batch is one concatenated
+    array plus offsets, so a whole distance matrix is filled in a single call.
+    Compiled code is cached on disk (cache=True) and the kernels are warmed here
+    so the first real call doesn't pay for compilation.
+
+    Returns:
+        Tuple of (banded_lev, banded_lev_matrix), or None when numba isn't installed
+    """
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        return None
+
+    @numba.njit(cache=True)
+    def banded_lev(a, b, tol):
+        # Same banded DP as CVParser.bounded_levenshtein, a no longer than b
+        over = tol + 1
+        if a.shape[0] > b.shape[0]:
+            a, b = b, a
+        len_a, len_b = a.shape[0], b.shape[0]
+        if len_b - len_a > tol:
+            return over
+        width = 2 * tol + 1
+        prev = np.empty(width, np.int64)
+        cur = np.empty(width, np.int64)
+        for k in range(width):
+            j = k - tol
+            prev[k] = j if 0 <= j <= len_b else over
+        for i in range(1, len_a + 1):
+            char_a = a[i - 1]
+            row_min = over
+            for k in range(width):
+                j = i + k - tol
+                if j < 0 or j > len_b:
+                    cur[k] = over
+                    continue
+                if j == 0:
+                    value = i
+                else:
+                    value = prev[k] + (char_a != b[j - 1])
+                    if k + 1 < width and prev[k + 1] + 1 < value:
+                        value = prev[k + 1] + 1
+                    if k > 0 and cur[k - 1] + 1 < value:
+                        value = cur[k - 1] + 1
+                cur[k] = value if value < over else over
+                if cur[k] < row_min:
+                    row_min = cur[k]
+            if row_min > tol:
+                return over
+            prev, cur = cur, prev
+        return prev[len_b - len_a + tol]
+
+    @numba.njit(cache=True)
+    def banded_lev_matrix(codes_a, offsets_a, codes_b, offsets_b, tol):
+        rows, cols = offsets_a.shape[0] - 1, offsets_b.shape[0] - 1
+        out = np.empty((rows, cols), np.int64)
+        for r in range(rows):
+            a = codes_a[offsets_a[r]:offsets_a[r + 1]]
+            for c in range(cols):
+                out[r, c] = banded_lev(a, codes_b[offsets_b[c]:offsets_b[c + 1]], tol)
+        return out
+
+    warm = np.zeros(1, np.uint32)
+    banded_lev(warm, warm, 1)
+    banded_lev_matrix(warm, np.array([0, 1]), warm, np.array([0, 1]), 1)
+    return banded_lev, banded_lev_matrix
+
+
+def _code_points(strings: List[str]):
+    """Lower-case strings as one concatenated uint32 code point array plus offsets"""
+    import numpy as np
+
+    data = ''.join(strings).lower().encode('utf-32-le')
+    lengths = [len(s.lower()) for s in strings]
+    offsets = np.zeros(len(strings) + 1, np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return np.frombuffer(data, dtype=np.uint32), offsets
+
+
+def _split_skills(value) -> list:
+    """Split a skills entry written as one string ("Python, SQL, Docker") into names"""
+    if not isinstance(value, str):
+        return [value]
+    return [name.strip() for name in value.split(',') if name.strip()]
 
 
 class CVParser:
@@ -14,26 +344,296 @@ class CVParser:
     
     @staticmethod
     def load_cv(cv_path: str) -> dict:
-        """Load CV from YAML file"""
-        with open(cv_path, 'r') as file:
-            return yaml.safe_load(file)
+        """
+        Load CV from a YAML (or JSON) file
+
+        Files whose content starts with '{' are parsed as JSON, which is much
+        faster than YAML; see convert_yaml_to_json. The parse is cached until
+        the file changes, and each call returns a deep copy of it, so callers
+        may modify the result freely.
+        """
+        cv_path = os.fspath(cv_path)
+        return copy.deepcopy(_load_cv_cached(cv_path, os.stat(cv_path).st_mtime_ns))
     
     @staticmethod
     def save_cv(cv_data: dict, output_path: str) -> None:
-        """Save CV to YAML file"""
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as file:
-            yaml.dump(cv_data, file, default_flow_style=False, sort_keys=False)
+        """Save CV to YAML file (atomically: written to a temp file, then renamed into place)"""
+        write_atomic(Path(output_path), _dump_cv(cv_data).encode('utf-8'))
+
+    @staticmethod
+    def convert_yaml_to_json(yaml_path: str, json_path: str) -> None:
+        """
+        Convert a YAML CV to an equivalent JSON file (a one-off setup step)
+
+        load_cv reads the JSON file through the JSON parser instead of the
+        YAML loader. Dates become ISO strings; everything else is unchanged.
+        """
+        cv_data = CVParser.load_cv(yaml_path)
+        if orjson is not None:
+            data = orjson.dumps(cv_data, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(cv_data, default=_json_default, indent=2, ensure_ascii=False).encode('utf-8')
+        write_atomic(Path(json_path), data + b'\n')
     
     @staticmethod
     def cv_to_string(cv_data: dict) -> str:
         """Convert CV dict to YAML string"""
-        return yaml.dump(cv_data, default_flow_style=False, sort_keys=False)
+        return _dump_cv(cv_data)
+    
+    @staticmethod
+    def cv_to_compact(cv_data: dict) -> str:
+        """
+        Convert CV dict to a minified single-line JSON string for LLM prompts
+
+        JSON is much cheaper to produce than YAML and models read it just as
+        well; dropping indentation and newlines makes the sample CV about 20%
+        smaller than indented JSON. Keys keep the CV's own order. Minified JSON
+        is also valid flow-style YAML, so the result still parses with string_to_cv.
+        """
+        if orjson is not None:
+            return orjson.dumps(cv_data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(cv_data, default=_json_default, separators=(',', ':'), ensure_ascii=False)
     
     @staticmethod
     def string_to_cv(cv_string: str) -> dict:
-        """Convert YAML string to CV dict"""
-        return yaml.safe_load(cv_string)
+        """Convert YAML or JSON string to CV dict (the parse is cached; each call returns a fresh copy)"""
+        return copy.deepcopy(_parse_cv_cached(cv_string))
+    
+    @staticmethod
+    def bounded_levenshtein(a: str, b: str, tol: int) -> int:
+        """
+        Edit distance between two strings, computed only up to tol (e.g. fuzzy skill names)
+
+        Uses Ukkonen's banded DP: only cells within tol of the diagonal are
+        computed (two rows of 2*tol+1 ints), and the scan stops as soon as a
+        whole row exceeds tol.
+
+        Args:
+            a: First string
+            b: Second string
+            tol: Largest distance of interest
+
+        Returns:
+            The edit distance if it is at most tol, otherwise tol + 1
+        """
+        over = tol + 1
+        if a == b:
+            return 0
+        if abs(len(a) - len(b)) > tol:
+            return over
+        if len(a) > len(b):
+            a, b = b, a
+
+        width = 2 * tol + 1
+        len_b = len(b)
+        # Band index k holds column j = i + k - tol of row i
+        prev = [k - tol if 0 <= k - tol <= len_b else over for k in range(width)]
+        cur = [over] * width
+
+        for i in range(1, len(a) + 1):
+            char_a = a[i - 1]
+            row_min = over
+            for k in range(width):
+                j = i + k - tol
+                if j < 0 or j > len_b:
+                    cur[k] = over
+                    continue
+                if j == 0:
+                    value = i
+                else:
+                    value = prev[k] + (char_a != b[j - 1])  # Substitution / match
+                    if k + 1 < width and prev[k + 1] + 1 < value:
+                        value = prev[k + 1] + 1  # Deletion
+                    if k > 0 and cur[k - 1] + 1 < value:
+                        value = cur[k - 1] + 1  # Insertion
+                cur[k] = value if value < over else over
+                if cur[k] < row_min:
+                    row_min = cur[k]
+            if row_min > tol:
+                return over  # Every path already exceeds tol
+            prev, cur = cur, prev
+
+        return prev[len_b - len(a) + tol]
+    
+    @staticmethod
+    def skill_distance_matrix(candidate_skills: List[str], job_skills: List[str], tol: int = 2) -> "np.ndarray":
+        """
+        Bounded edit distance between every candidate skill and every job skill
+
+        Case-insensitive, like skill_match_matrix, but needs no rapidfuzz: the
+        banded DP runs as a numba-compiled kernel when numba is installed and
+        falls back to bounded_levenshtein otherwise.
+
+        Args:
+            candidate_skills: Skills from the CV
+            job_skills: Skills named in the job posting
+            tol: Largest distance of interest
+
+        Returns:
+            (len(candidate_skills), len(job_skills)) int64 matrix of distances,
+            with tol + 1 wherever the distance exceeds tol
+        """
+        import numpy as np
+
+        kernels = _lev_kernels()
+        if kernels is None:
+            lowered = [skill.lower() for skill in job_skills]
+            return np.array(
+                [[CVParser.bounded_levenshtein(skill.lower(), job, tol) for job in lowered]
+                 for skill in candidate_skills],
+                dtype=np.int64,
+            ).reshape(len(candidate_skills), len(job_skills))
+
+        _, banded_lev_matrix = kernels
+        return banded_lev_matrix(*_code_points(candidate_skills), *_code_points(job_skills), tol)
+
+    @staticmethod
+    def skill_match_matrix(candidate_skills: List[str], job_skills: List[str]) -> "np.ndarray":
+        """
+        Score every candidate skill against every job skill
+
+        Uses rapidfuzz's bit-parallel Levenshtein across all cores, case-insensitively.
+
+        Args:
+            candidate_skills: Skills from the CV
+            job_skills: Skills named in the job posting
+
+        Returns:
+            (len(candidate_skills), len(job_skills)) float32 matrix of normalized
+            similarities in [0, 1], where 1 is an exact match
+        """
+        import numpy as np
+        from rapidfuzz import process
+        from rapidfuzz.distance import Levenshtein
+
+        return process.cdist(
+            candidate_skills,
+            job_skills,
+            scorer=Levenshtein.normalized_similarity,
+            processor=str.lower,
+            dtype=np.float32,
+            workers=-1,
+        )
+
+    @staticmethod
+    def skills_table(cv_data: dict) -> "np.ndarray":
+        """
+        Flatten the CV's skills into a numpy structured array
+
+        Fields are "name" (as written), "key" (lower-cased, for matching) and
+        "category" (the skills sub-section, '' for a flat list). A category
+        written as one comma-separated string gives one row per skill. The
+        table is kept out of the CV dict so it never reaches saved YAML or
+        prompts.
+        """
+        import numpy as np
+
+        skills = cv_data.get('skills') or {}
+        groups = skills.items() if isinstance(skills, Mapping) else (('', skills),)
+        rows = [
+            (name, name.lower(), str(category))
+            for category, names in groups
+            for name in (names if isinstance(names, list) else _split_skills(names))
+            if isinstance(name, str)
+        ]
+        # Each column is as wide as its longest value, so no name is truncated
+        widths = [max((len(row[i]) for row in rows), default=0) or 1 for i in range(len(_SKILL_FIELDS))]
+        return np.array(rows, dtype=[(field, f'U{width}') for field, width in zip(_SKILL_FIELDS, widths)])
+
+    @staticmethod
+    def matching_skills(cv_data: dict, job_skills: List[str]) -> List[str]:
+        """
+        CV skills that the job asks for, compared case-insensitively
+
+        Args:
+            cv_data: CV dictionary
+            job_skills: Skills named in the job posting, e.g.
+                [SKILL_KEYWORDS[i] for i in LinkedInScraper.scan_keywords(text)]
+
+        Returns:
+            Matching skill names as written in the CV, in CV order
+        """
+        import numpy as np
+
+        table = CVParser.skills_table(cv_data)
+        wanted = np.array([skill.lower() for skill in job_skills], dtype=str)
+        return table['name'][np.isin(table['key'], wanted)].tolist()
+
+
+# Job description container on LinkedIn job pages (public and logged-in layouts)
+_JOB_DESCRIPTION_SELECTOR = 'div.description__text, div.show-more-less-html__markup'
+
+# Skill keywords detected in job postings (matched as whole words; see _CASE_SENSITIVE_KEYWORDS)
+SKILL_KEYWORDS = (
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C", "C++", "C#", "Scala", "Kotlin",
+    "Swift", "Ruby", "PHP", "R", "MATLAB", "SQL", "NoSQL", "Bash",
+    "React", "Vue.js", "Angular", "Node.js", "Django", "Flask", "FastAPI", "Spring", "Express",
+    "TensorFlow", "PyTorch", "Keras", "scikit-learn", "Pandas", "NumPy", "Spark", "Hadoop",
+    "Kafka", "RabbitMQ", "Airflow", "Tableau", "Power BI",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "DynamoDB", "Snowflake",
+    "AWS", "GCP", "Azure", "Firebase", "Docker", "Kubernetes", "Terraform", "CI/CD", "Git", "Linux",
+    "GraphQL", "REST", "Microservices", "Machine Learning", "Deep Learning", "NLP", "Computer Vision",
+    "A/B testing", "LLM",
+)
+
+# Keywords that are also everyday English words ("ready to go", "the rest of the team")
+# only match as written; so do one- and two-letter keywords. The rest ignore case.
+_CASE_SENSITIVE_KEYWORDS = frozenset((
+    "Go", "Rust", "Swift", "Ruby", "React", "Angular", "Spring", "Express", "Flask", "Pandas",
+    "Spark", "Airflow", "Tableau", "Snowflake", "Azure", "REST",
+))
+
+
+def _keyword_ignores_case(keyword: str) -> bool:
+    return len(keyword) > 2 and keyword not in _CASE_SENSITIVE_KEYWORDS
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """
+    Regex matching keyword as a whole word
+
+    A keyword ending in a letter or digit must not be followed by a word
+    character, '+' or '#', so "C" does not match inside "C++" or "C#". The
+    check consumes the next character instead of using a lookahead, which
+    Hyperscan does not support. Word characters are ASCII-only in both the
+    Hyperscan and the regex matcher.
+    """
+    pattern = re.escape(keyword)
+    if keyword[0].isalnum():
+        pattern = r'\b' + pattern
+    if keyword[-1].isalnum():
+        pattern += r'(?:[^\w+#]|$)'
+    return pattern
+
+
+@lru_cache(maxsize=1)
+def _keyword_scanner():
+    """
+    Compile SKILL_KEYWORDS once into a single matcher
+
+    Returns:
+        A Hyperscan database (one DFA scan for all keywords) when python-hyperscan
+        is installed, otherwise one compiled regex with a group per keyword
+    """
+    patterns = [_keyword_pattern(keyword) for keyword in SKILL_KEYWORDS]
+    try:
+        import hyperscan
+    except ImportError:
+        return re.compile('|'.join(
+            f'((?i:{pattern}))' if _keyword_ignores_case(keyword) else f'({pattern})'
+            for keyword, pattern in zip(SKILL_KEYWORDS, patterns)
+        ), re.ASCII)
+
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[pattern.encode() for pattern in patterns],
+        ids=list(range(len(patterns))),
+        flags=[
+            hyperscan.HS_FLAG_SINGLEMATCH | (hyperscan.HS_FLAG_CASELESS if _keyword_ignores_case(keyword) else 0)
+            for keyword in SKILL_KEYWORDS
+        ],
+    )
+    return db
 
 
 class LinkedInScraper:
@@ -76,11 +676,55 @@ class LinkedInScraper:
             html_content: Raw HTML from LinkedIn job page
             
         Returns:
-            Extracted job posting text
+            Extracted job posting text, or None if no description block is found
         """
-        # Placeholder for BeautifulSoup implementation
-        print("[TODO] Implement HTML parsing for job postings")
-        return None
+        # selectolax parses in C (lexbor), far faster than BeautifulSoup with html.parser
+        from selectolax.lexbor import LexborHTMLParser
+
+        node = LexborHTMLParser(html_content).css_first(_JOB_DESCRIPTION_SELECTOR)
+        if node is None:
+            print("⚠ No job description found in HTML")
+            return None
+        return node.text(separator='\n', strip=True)
+    
+    @staticmethod
+    def scan_keywords(text: str) -> Set[int]:
+        """
+        Find which skill keywords a job posting mentions, in a single pass over the text
+
+        Args:
+            text: Job posting text
+
+        Returns:
+            Indices into SKILL_KEYWORDS of every keyword found
+        """
+        scanner = _keyword_scanner()
+        if isinstance(scanner, re.Pattern):
+            return {match.lastindex - 1 for match in scanner.finditer(text)}
+
+        found = set()
+
+        def on_match(keyword_id, start, end, flags, context):
+            found.add(keyword_id)
+
+        scanner.scan(text.encode('utf-8'), match_event_handler=on_match)
+        return found
+
+
+# PDF text styles: (font, size in pt, leading in pt), resolved once instead of per line
+_STYLES = {
+    'name': ('Helvetica-Bold', 18, 24),
+    'contact': ('Helvetica', 9.5, 14),
+    'section': ('Helvetica-Bold', 12, 17),
+    'entry': ('Helvetica-Bold', 10.5, 14),
+    'meta': ('Helvetica-Oblique', 9.5, 13),
+    'body': ('Helvetica', 10, 13),
+    'gap': ('Helvetica', 10, 6),
+}
+_PDF_MARGIN = 50  # Page margin in points
+
+# Suffix for default PDF names, so several PDFs written in the same second don't collide
+_PDF_SEQ = count()
 
 
 class PDFGenerator:
@@ -96,123 +740,237 @@ class PDFGenerator:
             output_path: Where to save the PDF
             
         Returns:
-            Path to generated PDF
-            
-        Note:
-            Placeholder for PDF generation using reportlab.
-            Real implementation would format the CV nicely for PDF output.
+            Path to generated PDF (outputs/cv_<unix time>_<sequence>.pdf by default)
         """
         if output_path is None:
-            output_dir = Path("outputs")
-            output_dir.mkdir(exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = output_dir / f"cv_{timestamp}.pdf"
+            output_path = ensure_dir("outputs") / f"cv_{int(time.time())}_{next(_PDF_SEQ)}.pdf"
         
-        print(f"[TODO] Generate PDF: {output_path}")
-        print("Implementation would use reportlab to format CV as professional PDF")
-        
-        return str(output_path)
+        return PDFGenerator.generate_professional_pdf(cv_data, str(output_path))
     
     @staticmethod
     def generate_professional_pdf(cv_data: dict, output_path: str) -> str:
         """
         Generate a professionally formatted PDF from CV data
-        
-        Future implementation will include:
-        - Professional formatting with proper spacing
-        - Color scheme and typography
-        - Logo or header with contact info
-        - Proper page breaks
-        - ATS-friendly formatting
+
+        Draws straight onto a reportlab canvas: the CV is first laid out into
+        wrapped lines, then drawn top to bottom, switching fonts only when the
+        style changes and starting a new page when the bottom margin is reached.
+
+        Args:
+            cv_data: CV dictionary
+            output_path: Where to save the PDF
+
+        Returns:
+            Path to generated PDF
         """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
         print(f"Generating professional PDF: {output_path}")
-        # Will use reportlab library
-        return output_path
+        ensure_dir(Path(output_path).parent)
+
+        page_width, page_height = A4
+        lines = PDFGenerator._layout_cv(cv_data, page_width - 2 * _PDF_MARGIN)
+
+        pdf = canvas.Canvas(str(output_path), pagesize=A4)
+        pdf.setTitle(cv_data.get('personal_info', {}).get('name', 'CV'))
+        y = page_height - _PDF_MARGIN
+        current_style = None
+
+        for style, text, indent in lines:
+            font, size, leading = _STYLES[style]
+            if y - leading < _PDF_MARGIN:
+                pdf.showPage()  # Resets the graphics state, so the font is set again
+                y = page_height - _PDF_MARGIN
+                current_style = None
+            y -= leading
+            if not text:
+                continue  # Vertical spacing only
+            if style != current_style:
+                pdf.setFont(font, size)
+                current_style = style
+            if style in ('name', 'contact'):
+                pdf.drawCentredString(page_width / 2, y, text)
+            else:
+                pdf.drawString(_PDF_MARGIN + indent, y, text)
+
+        pdf.save()
+        print(f"✓ PDF saved: {output_path}")
+        return str(output_path)
+
+    @staticmethod
+    def _layout_cv(cv_data: dict, width: float) -> List[tuple]:
+        """
+        Lay the CV out as wrapped lines
+
+        Args:
+            cv_data: CV dictionary
+            width: Usable line width in points
+
+        Returns:
+            List of (style, text, indent) tuples; an empty text is a spacer
+        """
+        from reportlab.lib.utils import simpleSplit
+
+        lines = []
+
+        def add(style, text, indent=0, hanging=0):
+            font, size, _ = _STYLES[style]
+            wrapped = simpleSplit(str(text), font, size, width - indent - hanging) or ['']
+            lines.append((style, wrapped[0], indent))
+            lines.extend((style, rest, indent + hanging) for rest in wrapped[1:])
+
+        def bullets(items):
+            if isinstance(items, str):
+                items = [items]
+            for item in items or []:
+                add('body', f"• {item}", indent=6, hanging=8)
+
+        def dates(entry):
+            if entry.get('date'):
+                return str(entry['date'])
+            return ' – '.join(str(entry[key]) for key in ('start_date', 'end_date') if entry.get(key))
+
+        def section(title):
+            lines.append(('gap', '', 0))
+            add('section', title.upper())
+
+        personal = cv_data.get('personal_info', {})
+        if personal:
+            add('name', personal.get('name', ''))
+            contact = [personal.get(key) for key in ('location', 'email', 'phone', 'linkedin', 'github')]
+            add('contact', ' | '.join(str(item) for item in contact if item))
+
+        if cv_data.get('education'):
+            section('Education')
+            for edu in cv_data['education']:
+                add('entry', ' — '.join(x for x in (edu.get('degree'), edu.get('institution', edu.get('school'))) if x))
+                add('meta', ' | '.join(x for x in (edu.get('location'), dates(edu)) if x))
+                courses = edu.get('courses')
+                if courses:
+                    add('body', f"Courses: {', '.join(courses) if isinstance(courses, list) else courses}", hanging=8)
+
+        if cv_data.get('experience'):
+            section('Experience')
+            for exp in cv_data['experience']:
+                add('entry', ' — '.join(x for x in (exp.get('title'), exp.get('company')) if x))
+                add('meta', ' | '.join(x for x in (exp.get('location'), dates(exp)) if x))
+                bullets(exp.get('achievements'))
+
+        skills = cv_data.get('skills')
+        if skills:
+            section('Skills')
+            if isinstance(skills, dict):
+                for category, values in skills.items():
+                    if isinstance(values, list):
+                        values = ', '.join(str(value) for value in values)
+                    add('body', f"{category.replace('_', ' ').title()}: {values}", hanging=8)
+            else:
+                add('body', ', '.join(skills) if isinstance(skills, list) else skills, hanging=8)
+
+        if cv_data.get('projects'):
+            section('Projects')
+            for proj in cv_data['projects']:
+                add('entry', ' — '.join(x for x in (proj.get('name'), proj.get('type')) if x))
+                meta = [dates(proj)]
+                if proj.get('technologies'):
+                    meta.append(', '.join(proj['technologies']))
+                add('meta', ' | '.join(x for x in meta if x))
+                bullets(proj.get('descriptions', proj.get('description')))
+
+        return lines
+
+
+# Sample postings for JobPostingMocker, dedented and interned once at import
+_SAMPLE_POSTINGS: Mapping[str, str] = MappingProxyType({
+    key: sys.intern(textwrap.dedent(text).strip())
+    for key, text in {
+        "data_scientist": """
+            Senior Data Scientist
+            Company: DataCorp Inc.
+            Location: New York, NY
+
+            We're seeking a Senior Data Scientist to lead our analytics team.
+
+            Responsibilities:
+            - Build predictive models and analytical frameworks
+            - Lead cross-functional projects with engineering and product teams
+            - Mentor junior data scientists
+            - Deploy models to production using Python and cloud platforms
+
+            Requirements:
+            - 5+ years in data science or analytics
+            - Expert in Python, SQL, and machine learning libraries
+            - Experience with TensorFlow or PyTorch
+            - Knowledge of AWS or GCP
+            - Strong communication skills
+
+            Nice to Have:
+            - Published research or papers
+            - Experience with A/B testing and experimentation
+            - Knowledge of big data tools (Spark, Hadoop)
+        """,
+
+        "backend_engineer": """
+            Senior Backend Engineer
+            Company: ScaleTech
+
+            Join our backend team building scalable systems.
+
+            Responsibilities:
+            - Design and implement backend services
+            - Improve system performance and reliability
+            - Lead architectural decisions
+            - Mentor engineers on best practices
+
+            Requirements:
+            - 5+ years backend development experience
+            - Proficiency in Python or Java
+            - Experience with microservices architecture
+            - Strong knowledge of databases (SQL and NoSQL)
+            - AWS or similar cloud platform experience
+
+            Nice to Have:
+            - Kubernetes experience
+            - Experience with message queues (RabbitMQ, Kafka)
+            - Open source contributions
+        """,
+
+        "full_stack_engineer": """
+            Full Stack Engineer
+            Company: WebInnovate
+
+            Build modern web applications end-to-end.
+
+            Responsibilities:
+            - Develop full-stack features using React and Node.js
+            - Collaborate with designers and product managers
+            - Write clean, maintainable code
+            - Participate in code reviews
+
+            Requirements:
+            - 3+ years full stack development
+            - Strong JavaScript/TypeScript skills
+            - React or Vue.js experience
+            - Node.js or similar backend framework
+            - PostgreSQL or MongoDB experience
+
+            Nice to Have:
+            - Docker and CI/CD experience
+            - AWS or Firebase experience
+            - Mobile development experience
+        """,
+    }.items()
+})
 
 
 class JobPostingMocker:
     """Mock job postings for testing without LinkedIn"""
     
     @staticmethod
-    def get_sample_postings() -> Dict[str, str]:
-        """Get sample job postings for testing"""
-        return {
-            "data_scientist": """
-                Senior Data Scientist
-                Company: DataCorp Inc.
-                Location: New York, NY
-                
-                We're seeking a Senior Data Scientist to lead our analytics team.
-                
-                Responsibilities:
-                - Build predictive models and analytical frameworks
-                - Lead cross-functional projects with engineering and product teams
-                - Mentor junior data scientists
-                - Deploy models to production using Python and cloud platforms
-                
-                Requirements:
-                - 5+ years in data science or analytics
-                - Expert in Python, SQL, and machine learning libraries
-                - Experience with TensorFlow or PyTorch
-                - Knowledge of AWS or GCP
-                - Strong communication skills
-                
-                Nice to Have:
-                - Published research or papers
-                - Experience with A/B testing and experimentation
-                - Knowledge of big data tools (Spark, Hadoop)
-            """,
-            
-            "backend_engineer": """
-                Senior Backend Engineer
-                Company: ScaleTech
-                
-                Join our backend team building scalable systems.
-                
-                Responsibilities:
-                - Design and implement backend services
-                - Improve system performance and reliability
-                - Lead architectural decisions
-                - Mentor engineers on best practices
-                
-                Requirements:
-                - 5+ years backend development experience
-                - Proficiency in Python or Java
-                - Experience with microservices architecture
-                - Strong knowledge of databases (SQL and NoSQL)
-                - AWS or similar cloud platform experience
-                
-                Nice to Have:
-                - Kubernetes experience
-                - Experience with message queues (RabbitMQ, Kafka)
-                - Open source contributions
-            """,
-            
-            "full_stack_engineer": """
-                Full Stack Engineer
-                Company: WebInnovate
-                
-                Build modern web applications end-to-end.
-                
-                Responsibilities:
-                - Develop full-stack features using React and Node.js
-                - Collaborate with designers and product managers
-                - Write clean, maintainable code
-                - Participate in code reviews
-                
-                Requirements:
-                - 3+ years full stack development
-                - Strong JavaScript/TypeScript skills
-                - React or Vue.js experience
-                - Node.js or similar backend framework
-                - PostgreSQL or MongoDB experience
-                
-                Nice to Have:
-                - Docker and CI/CD experience
-                - AWS or Firebase experience
-                - Mobile development experience
-            """
-        }
+    def get_sample_postings() -> Mapping[str, str]:
+        """Get sample job postings for testing (shared, read-only mapping)"""
+        return _SAMPLE_POSTINGS
 
 
 # Example usage
@@ -0,0 +1,32 @@
+"""
+Tests for the output post-processing in crew.py
+"""
+
+from crew import JobCVCrew
+
+
+def _crew() -> JobCVCrew:
+    """A JobCVCrew with a base CV but without loading files or building agents"""
+    crew = JobCVCrew.__new__(JobCVCrew)
+    crew.validate = True
+    crew.fused = False
+    crew.base_cv = {"personal_info": {}, "projects": []}
+    return crew
+
+
+def test_clean_yaml_output_strips_leading_intro():
+    cleaned, parsed, valid = _crew()._clean_yaml_output("Here is the customized CV:\npersonal_info:\n  name: Ada\n")
+
+    assert cleaned == "personal_info:\n  name: Ada"
+    assert parsed == {"personal_info": {"name": "Ada"}}
+    assert valid
+
+
+def test_clean_yaml_output_keeps_intro_phrase_inside_a_field():
+    output = 'personal_info:\n  name: Ada\nprojects:\n  - name: "Customized CV: generator"\n'
+
+    cleaned, parsed, valid = _crew()._clean_yaml_output(output)
+
+    assert cleaned == output.strip()
+    assert parsed["projects"][0]["name"] == "Customized CV: generator"
+    assert valid
@@ -0,0 +1,18 @@
+"""
+Tests for the task prompt templates in tasks.py
+"""
+
+import pytest
+
+from tasks import ANALYZE_AND_CUSTOMIZE_DESCRIPTION, CUSTOMIZE_CV_DESCRIPTION, MATCH_CV_DESCRIPTION
+
+
+@pytest.mark.parametrize(
+    "description",
+    [MATCH_CV_DESCRIPTION, CUSTOMIZE_CV_DESCRIPTION, ANALYZE_AND_CUSTOMIZE_DESCRIPTION],
+)
+def test_cv_boundary_directly_precedes_job(description):
+    # llm.CachingLLM caches everything up to </CV>; only the per-job inputs may follow it
+    assert description.count("</CV>") == 1
+    assert description.split("</CV>", 1)[1].lstrip().startswith("<JOB>{job_posting}</JOB>")
+    assert description.index("<CV>") < description.index("</CV>") < description.index("{job_posting}")
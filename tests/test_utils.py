@@ -0,0 +1,19 @@
+"""
+Tests for the CV and job posting helpers in utils.py
+"""
+
+from utils import SKILL_KEYWORDS, LinkedInScraper
+
+
+def _skills(text: str) -> set:
+    return {SKILL_KEYWORDS[i] for i in LinkedInScraper.scan_keywords(text)}
+
+
+def test_scan_keywords_ignores_everyday_words():
+    assert _skills("Ready to go? Join the rest of the team and let your creativity go wild") == set()
+
+
+def test_scan_keywords_matches_skills():
+    assert _skills("We use Go, REST APIs, python, C++ and C# on kubernetes") == {
+        "Go", "REST", "Python", "C++", "C#", "Kubernetes",
+    }